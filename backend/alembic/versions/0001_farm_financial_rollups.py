@@ -0,0 +1,86 @@
+"""farm financial rollups
+
+Revision ID: 0001_farm_financial_rollups
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.db_types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_farm_financial_rollups'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "farm_financials",
+        sa.Column("farm_id", GUID(), sa.ForeignKey("farms.id"), primary_key=True),
+        sa.Column("total_expenses", sa.Numeric(14, 2), nullable=False),
+        sa.Column("total_income", sa.Numeric(14, 2), nullable=False),
+        sa.Column("expense_count", sa.Integer(), nullable=False),
+        sa.Column("yield_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "farm_category_totals",
+        sa.Column("farm_id", GUID(), sa.ForeignKey("farms.id"), primary_key=True),
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False),
+    )
+    op.create_table(
+        "farm_monthly_totals",
+        sa.Column("farm_id", GUID(), sa.ForeignKey("farms.id"), primary_key=True),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("expenses", sa.Numeric(14, 2), nullable=False),
+        sa.Column("income", sa.Numeric(14, 2), nullable=False),
+    )
+    _backfill()
+
+
+def _backfill() -> None:
+    """Roll up the existing ledgers so farms don't start counting from zero"""
+    if op.get_bind().dialect.name == "postgresql":
+        month = """CAST(date_trunc('month', "date") AS DATE)"""
+    else:
+        month = """date("date", 'start of month')"""
+    op.execute(
+        """
+        INSERT INTO farm_financials (farm_id, total_expenses, total_income, expense_count, yield_count)
+        SELECT farms.id,
+               COALESCE((SELECT SUM(amount) FROM expenses WHERE expenses.farm_id = farms.id), 0),
+               COALESCE((SELECT SUM(total_income) FROM yields WHERE yields.farm_id = farms.id), 0),
+               (SELECT COUNT(*) FROM expenses WHERE expenses.farm_id = farms.id),
+               (SELECT COUNT(*) FROM yields WHERE yields.farm_id = farms.id)
+        FROM farms
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO farm_category_totals (farm_id, category, amount)
+        SELECT farm_id, category, SUM(amount) FROM expenses GROUP BY farm_id, category
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO farm_monthly_totals (farm_id, month, expenses, income)
+        SELECT farm_id, month, SUM(expenses), SUM(income)
+        FROM (
+            SELECT farm_id, {month} AS month, amount AS expenses, 0 AS income FROM expenses
+            UNION ALL
+            SELECT farm_id, {month} AS month, 0 AS expenses, total_income AS income FROM yields
+        ) AS ledger
+        GROUP BY farm_id, month
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("farm_monthly_totals")
+    op.drop_table("farm_category_totals")
+    op.drop_table("farm_financials")
@@ -0,0 +1,28 @@
+"""composite farm/date indexes on expenses and yields
+
+Revision ID: 0002_ledger_farm_indexes
+Revises: 0001_farm_financial_rollups
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_ledger_farm_indexes'
+down_revision = '0001_farm_financial_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_expenses_farm_id_date", "expenses", ["farm_id", "date"])
+    op.create_index("ix_expenses_farm_id_category_amount", "expenses", ["farm_id", "category", "amount"])
+    op.create_index("ix_yields_farm_id_date_total_income", "yields", ["farm_id", "date", "total_income"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_yields_farm_id_date_total_income", table_name="yields")
+    op.drop_index("ix_expenses_farm_id_category_amount", table_name="expenses")
+    op.drop_index("ix_expenses_farm_id_date", table_name="expenses")
@@ -0,0 +1,43 @@
+"""report job queue
+
+Revision ID: 0003_report_jobs
+Revises: 0002_ledger_farm_indexes
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.db_types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_report_jobs'
+down_revision = '0002_ledger_farm_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_jobs",
+        sa.Column("id", GUID(), primary_key=True),
+        sa.Column("user_id", GUID(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("farm_id", GUID(), sa.ForeignKey("farms.id"), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("data_version", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_report_jobs_status_available_at", "report_jobs", ["status", "available_at"])
+    op.create_index("ix_report_jobs_farm_id_kind_data_version", "report_jobs", ["farm_id", "kind", "data_version"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_jobs_farm_id_kind_data_version", table_name="report_jobs")
+    op.drop_index("ix_report_jobs_status_available_at", table_name="report_jobs")
+    op.drop_table("report_jobs")
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -9,17 +9,85 @@ ENV_PATH = BASE_DIR / ".env"
 
 class Settings(BaseSettings):
     DATABASE_URL: str = f"sqlite:///{DB_PATH}"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
     JWT_SECRET_KEY: str = "supersecretkey"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_MAX_ENTRIES: int = 4096
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
 
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
     TWILIO_PHONE_NUMBER: Optional[str] = None
+    OTP_SENDER: str = "auto"  # "auto" (twilio if configured, else console), "twilio", "console" or "http"
+    OTP_SMS_GATEWAY_URL: Optional[str] = None
+    OTP_DELIVERY_WORKERS: int = 4
+    OTP_DELIVERY_MAX_ATTEMPTS: int = 3
+    OTP_DELIVERY_RETRY_SECONDS: float = 1.0
+    OTP_DELIVERY_QUEUE_SIZE: int = 10000
+
+    LEDGER_PAGE_DEFAULT_LIMIT: int = 500
+    LEDGER_PAGE_MAX_LIMIT: int = 1000
+    LEDGER_EXPORT_BATCH_ROWS: int = 1000
+
+    PORTFOLIO_TOP_CATEGORIES: int = 3
+    PORTFOLIO_TREND_DAYS: int = 30
+    TREND_MAX_BUCKETS: int = 3660
+
+    REPORT_CACHE_DIR: str = str(BASE_DIR / "report_cache")
+    REPORT_RENDER_WORKERS: int = 2
+    REPORT_MAX_LEDGER_ROWS: int = 2000
+    REPORT_CACHE_GRACE_SECONDS: float = 3600.0
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_MAX_ATTEMPTS: int = 3
+    REPORT_JOB_RETRY_SECONDS: float = 10.0
+    REPORT_JOB_LEASE_SECONDS: float = 300.0
+    REPORT_JOB_POLL_SECONDS: float = 2.0
 
     OTP_LENGTH: int = 6
     OTP_EXPIRE_MINUTES: int = 5
+    OTP_MAX_ATTEMPTS: int = 5
+    OTP_STORE_BACKEND: str = "memory"  # "memory" (single process) or "sqlite" (shared by workers)
+    OTP_STORE_SQLITE_PATH: str = str(BASE_DIR / "otp_store.db")
+    OTP_SWEEP_INTERVAL_SECONDS: float = 30.0
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (single process) or "sqlite" (shared by workers)
+    RATE_LIMIT_SQLITE_PATH: str = str(BASE_DIR / "rate_limits.db")
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    # "<ip|phone>:<requests>/<seconds>" rules per route
+    RATE_LIMITS: Dict[str, List[str]] = {
+        "auth.register": ["phone:3/600", "ip:20/600"],
+        "auth.request_otp": ["phone:5/600", "ip:30/600"],
+        "auth.verify_otp": ["phone:10/600", "ip:60/600"],
+    }
+
+    GEOCODE_CACHE_MAX_ENTRIES: int = 5000
+    GEOCODE_CACHE_TTL_SECONDS: float = 30 * 24 * 3600.0
+    GEOCODE_NEGATIVE_TTL_SECONDS: float = 24 * 3600.0
+    GEOCODE_SEED_PATH: Optional[str] = str(BASE_DIR / "geocode_seed.csv")  # name,latitude,longitude CSV
+
+    WEATHER_GRID_DEGREES: float = 0.1  # ~11 km cells; farms in one cell share a forecast
+    WEATHER_CACHE_TTL_SECONDS: float = 3600.0
+    WEATHER_CACHE_MAX_CELLS: int = 10000
+    WEATHER_SOURCE: str = "forecast"  # "forecast" (climatology fallback) or "climatology" (normals first)
+    WEATHER_FORECAST_DEADLINE_SECONDS: float = 3.0
+    CLIMATOLOGY_PATH: Optional[str] = str(BASE_DIR / "climatology.npy")
+
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 30.0
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 50
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 20
+    HTTP_CLIENT_KEEPALIVE_SECONDS: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = True  # needs the optional h2 package
+    HTTP_CLIENT_CONNECT_RETRIES: int = 2
+    HTTP_CLIENT_MAX_RETRIES: int = 2
+    HTTP_CLIENT_RETRY_BACKOFF_SECONDS: float = 0.5
 
     OPENROUTER_API_KEY: Optional[str] = None
     OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
@@ -28,6 +96,17 @@ class Settings(BaseSettings):
     OPENROUTER_TITLE: Optional[str] = None
     OPENROUTER_APP_NAME: str = "AgriSmart Chatbot"
 
+    OPS_API_TOKEN: Optional[str] = None  # X-Ops-Token for operator routes such as /prediction/model/reload
+    PREDICTION_TOP_K: int = 3
+    PREDICTION_TOP_K_MAX: int = 10
+    PREDICTION_CACHE_TTL_SECONDS: float = 600.0
+    PREDICTION_CACHE_MAX_ENTRIES: int = 50000
+    PREDICTION_CACHE_DECIMALS: int = 2  # inputs equal to this many decimals share a cached result
+    PREDICTION_BATCH_MAX_ROWS: int = 10000
+    PREDICTION_BATCH_STREAM_CHUNK_ROWS: int = 500
+    PREDICTION_MICROBATCH_WINDOW_MS: float = 5.0
+    PREDICTION_MICROBATCH_MAX_ROWS: int = 64
+
     PLANTID_API_KEY: Optional[str] = None
     CHATBOT_IMAGE_UPLOAD_DIR: str = "uploads/images"
 
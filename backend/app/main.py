@@ -1,6 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import auth, farms, expenses, yields, reports, charts, dashboard, ai_expense, prediction, chatbot
+from app.ml.model_service import warm_up
+from app.ml.batcher import prediction_batcher
+from app.database import async_engine
+from app.services.report_service import shutdown_render_pool
+from app.services.report_jobs import report_job_queue
+from app.services.otp_delivery import otp_delivery
+from app.utils.http_client import http_clients
+from app.utils.principal_cache import principal_cache
+from app.utils.response_cache import response_cache
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 app = FastAPI(
     title="AgriSmart Backend API",
@@ -15,6 +25,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -23,6 +34,7 @@ app.include_router(farms.router)
 app.include_router(expenses.router)
 app.include_router(yields.router)
 app.include_router(reports.router)
+app.include_router(reports.farm_router)
 app.include_router(charts.router)
 app.include_router(dashboard.router)
 app.include_router(ai_expense.router)
@@ -30,6 +42,41 @@ app.include_router(prediction.router)
 app.include_router(chatbot.router)
 
 
+@app.on_event("startup")
+async def load_models():
+    warm_up()
+    prediction_batcher.start()
+    report_job_queue.start()
+    otp_delivery.start()
+    http_clients.start()
+
+
+@app.on_event("shutdown")
+async def stop_prediction_scheduler():
+    await prediction_batcher.stop()
+
+
+@app.on_event("shutdown")
+async def stop_report_workers():
+    await report_job_queue.stop()
+    shutdown_render_pool()
+
+
+@app.on_event("shutdown")
+async def stop_otp_delivery():
+    await otp_delivery.stop()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.close()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     return {
@@ -44,3 +91,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Process-local counters for the in-memory caches and background queues"""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "otp_delivery": otp_delivery.metrics(),
+        "http_clients": http_clients.metrics(),
+    }
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.ml.model_service import run_crop_prediction_batch
+
+
+class PredictionBatcher:
+    """Micro-batches concurrent single-row predictions into one matrix call.
+
+    Requests arriving within ``window_ms`` of the first queued row (or until
+    ``max_rows`` are collected) are scored together on a worker thread, and
+    each waiting coroutine receives its own row's result.
+    """
+
+    def __init__(self, window_ms: float, max_rows: int):
+        self.window = max(0.0, window_ms) / 1000
+        self.max_rows = max(1, max_rows)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches = 0
+        self.rows = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        worker, queue = self._worker, self._queue
+        self._worker = None
+        if worker is not None:
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        while queue is not None and not queue.empty():
+            _, future = queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction scheduler stopped"))
+
+    async def submit(self, model_input: Dict) -> Dict:
+        self.start()
+        future = self._loop.create_future()
+        self._queue.put_nowait((model_input, future))
+        return await future
+
+    def metrics(self) -> Dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window * 1000,
+            "max_rows": self.max_rows,
+        }
+
+    async def _collect(self) -> List[Tuple[Dict, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.window
+        while len(batch) < self.max_rows:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (client disconnects) are dropped before scoring.
+            batch = [(model_input, future) for model_input, future in batch if not future.done()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.rows += len(batch)
+            self.last_batch_size = len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+            try:
+                results = await self._loop.run_in_executor(
+                    None, run_crop_prediction_batch, [model_input for model_input, _ in batch]
+                )
+            except BaseException as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e if isinstance(e, Exception) else RuntimeError("Prediction scheduler stopped"))
+                if not isinstance(e, Exception):
+                    raise
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+prediction_batcher = PredictionBatcher(
+    window_ms=settings.PREDICTION_MICROBATCH_WINDOW_MS,
+    max_rows=settings.PREDICTION_MICROBATCH_MAX_ROWS,
+)
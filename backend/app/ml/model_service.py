@@ -1,67 +1,239 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 import os
 import pickle
+import threading
+import time
+from app.config import settings
+from app.ml.prediction_cache import prediction_cache
+
+_SEARCH_DIRS = [".", "..", "./backend/app/ml", "./app/ml"]
+_ARTIFACT_CANDIDATES = {
+    "model": ["xgb_crop_model.pkl", "xgb_crop_model (1).pkl"],
+    "scaler": ["scaler.pkl", "scaler (1).pkl"],
+    "crop_encoder": ["crop_encoder.pkl", "crop_encoder (1).pkl"],
+    "croptype_encoder": ["croptype_encoder.pkl", "croptype_encoder (1).pkl"],
+}
+
+# Model feature columns after the encoded crop type, with their defaults.
+_FEATURE_DEFAULTS = (
+    ("n", 0.0),
+    ("p", 0.0),
+    ("k", 0.0),
+    ("ph", 7.0),
+    ("rainfall", 0.0),
+    ("temperature", 0.0),
+    ("area_hectares", 1.0),
+)
+
+# Process-wide model registry. Artifacts are loaded once and shared by all
+# requests; a reload builds a complete new tuple before swapping it in, so a
+# request never sees a half-loaded set.
+_registry_lock = threading.Lock()
+_artifacts: Optional[Tuple[object, object, object, object]] = None
+_artifact_stamp: Optional[Tuple] = None
+_loaded_at: Optional[float] = None
+_load_error: Optional[Exception] = None
 
 
 def run_crop_prediction(model_input: Dict) -> Dict:
+    return run_crop_prediction_batch([model_input])[0]
+
+
+def run_crop_prediction_batch(model_inputs: List[Dict]) -> List[Dict]:
+    """Score many rows with one encode, scale and predict call; results keep input order.
+
+    Rows are keyed by their encoded, quantized feature vector, so inputs the
+    model can't tell apart share a prediction cache entry; only the rest
+    reach the model. Fallback results are never cached.
+    """
+    if not model_inputs:
+        return []
+    # Read before the artifacts: a reload in between bumps it and the results are not cached
+    generation = prediction_cache.generation
     try:
-        model, scaler, le_crop, le_crop_type = _load_artifacts()
-        crop_type = str(model_input.get("crop_type", "")).strip()
-        n = float(model_input.get("n", 0))
-        p = float(model_input.get("p", 0))
-        k = float(model_input.get("k", 0))
-        ph = float(model_input.get("ph", 7.0))
-        rainfall = float(model_input.get("rainfall", 0))
-        temperature = float(model_input.get("temperature", 0))
-        area = float(model_input.get("area_hectares", 1.0))
-
-        crop_type_encoded = _encode_crop_type(le_crop_type, crop_type)
+        artifacts = get_artifacts()
+        X_input = _encode_batch(artifacts[3], model_inputs)
+    except Exception:
+        return [_fallback_prediction(row) for row in model_inputs]
+
+    top_ks = [_top_k(row) for row in model_inputs]
+    keys = [_cache_key(row, k) for row, k in zip(X_input, top_ks)]
+    results: List[Optional[Dict]] = [prediction_cache.get(key) for key in keys]
+    # Rows that quantize to the same key are scored once
+    missing: Dict[Tuple, List[int]] = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        firsts = [indexes[0] for indexes in missing.values()]
         try:
-            import numpy as _np
-            X_input = _np.array([[crop_type_encoded, n, p, k, ph, rainfall, temperature, area]], dtype=float)
-            X_scaled = scaler.transform(X_input) if hasattr(scaler, "transform") else X_input
+            scored = _score_batch(artifacts, X_input[firsts], [top_ks[i] for i in firsts])
         except Exception:
-            X_scaled = [[crop_type_encoded, n, p, k, ph, rainfall, temperature, area]]
-        pred = model.predict(X_scaled)[0]
-        crop_name = _inverse_crop(le_crop, int(pred))
-        expected = max(500.0, (n + p + k) / 3 * max(area, 0.1) * 20)
-        return {"recommended_crop": str(crop_name), "expected_yield": float(round(expected, 2)), "confidence": 0.82}
-    except Exception:
-        base_crop = model_input.get("crop_type", "Generic Crop").title()
-        area = float(model_input.get("area_hectares", 1.0) or 1.0)
-        n = float(model_input.get("n", 0))
-        p = float(model_input.get("p", 0))
-        k = float(model_input.get("k", 0))
-        nutrient_score = (n + p + k) / 3 if any([n, p, k]) else 0
-        expected_yield = max(500.0, nutrient_score * max(area, 0.1) * 20)
-        confidence = min(0.95, 0.5 + nutrient_score / 300)
-        return {"recommended_crop": base_crop, "expected_yield": round(expected_yield, 2), "confidence": round(confidence, 2)}
+            scored = [_fallback_prediction(model_inputs[i]) for i in firsts]
+        else:
+            for key, result in zip(missing, scored):
+                prediction_cache.put(key, result, generation)
+        for indexes, result in zip(missing.values(), scored):
+            for i in indexes:
+                results[i] = result
+    return [dict(result) for result in results]
+
+
+def _cache_key(encoded_row, top_k: int) -> Tuple:
+    decimals = settings.PREDICTION_CACHE_DECIMALS
+    return (top_k, *(round(float(value), decimals) for value in encoded_row))
 
 
-def _load_artifacts() -> Tuple[object, object, object, object]:
-    search_dirs = [".", "..", "./backend/app/ml", "./app/ml"]
+def _encode_batch(le_crop_type, model_inputs: List[Dict]):
+    """Model input matrix: encoded crop type followed by the _FEATURE_DEFAULTS columns"""
+    import numpy as _np
+    crop_types = [str(row.get("crop_type", "")).strip() for row in model_inputs]
+    features = _np.array(
+        [[float(row.get(name, default)) for name, default in _FEATURE_DEFAULTS] for row in model_inputs],
+        dtype=float,
+    )
+    return _np.column_stack([_encode_crop_types(le_crop_type, crop_types), features])
+
+
+def _score_batch(artifacts: Tuple[object, object, object, object], X_input, top_ks: List[int]) -> List[Dict]:
+    """Model predictions for encoded rows (see _encode_batch)"""
+    model, scaler, le_crop, _ = artifacts
+    import numpy as _np
+    X_scaled = scaler.transform(X_input) if hasattr(scaler, "transform") else X_input
+    # One probability matrix for the whole batch; the best k columns per row
+    # give both the recommendation and the alternatives.
+    proba = _np.asarray(model.predict_proba(X_scaled), dtype=float)
+    order = _np.argsort(-proba, axis=1, kind="stable")[:, :max(top_ks)]
+    top_proba = _np.take_along_axis(proba, order, axis=1)
+    class_labels = getattr(model, "classes_", None)
+    if class_labels is None:
+        class_labels = _np.arange(proba.shape[1])
+    class_names = _np.asarray(_inverse_crops(le_crop, class_labels), dtype=object)
+    top_names = class_names[order]
+    features = X_input[:, 1:]
+    nutrient_score = features[:, :3].mean(axis=1)
+    area = features[:, 6]
+    expected = _np.maximum(500.0, nutrient_score * _np.maximum(area, 0.1) * 20)
+    return [
+        {
+            "recommended_crop": str(names[0]),
+            "expected_yield": round(float(value), 2),
+            "confidence": round(float(probs[0]), 4),
+            "top_crops": [
+                {"crop": str(name), "probability": round(float(prob), 4)}
+                for name, prob in zip(names[:k], probs[:k])
+            ],
+        }
+        for names, probs, value, k in zip(top_names, top_proba, expected, top_ks)
+    ]
+
+
+def _top_k(model_input: Dict) -> int:
+    k = model_input.get("top_k") or settings.PREDICTION_TOP_K
+    return max(1, min(int(k), settings.PREDICTION_TOP_K_MAX))
+
+
+def _fallback_prediction(model_input: Dict) -> Dict:
+    # Without a model there is no probability to report: echo the requested
+    # crop with zero confidence and no ranked alternatives.
+    base_crop = model_input.get("crop_type", "Generic Crop").title()
+    area = float(model_input.get("area_hectares", 1.0) or 1.0)
+    n = float(model_input.get("n", 0))
+    p = float(model_input.get("p", 0))
+    k = float(model_input.get("k", 0))
+    nutrient_score = (n + p + k) / 3 if any([n, p, k]) else 0
+    expected_yield = max(500.0, nutrient_score * max(area, 0.1) * 20)
+    return {"recommended_crop": base_crop, "expected_yield": round(expected_yield, 2), "confidence": 0.0, "top_crops": []}
+
+
+def get_artifacts() -> Tuple[object, object, object, object]:
+    """Return the shared model artifacts, loading them on first use"""
+    global _load_error
+    artifacts = _artifacts
+    if artifacts is not None:
+        return artifacts
+    with _registry_lock:
+        if _artifacts is None:
+            # A failed load is remembered so the fallback path does not rescan
+            # the disk on every request; reload_artifacts() clears it.
+            if _load_error is not None:
+                raise _load_error
+            try:
+                paths = _resolve_artifact_paths()
+                _install_artifacts(_load_artifacts(paths), _stamp(paths))
+            except Exception as e:
+                _load_error = e
+                raise
+        return _artifacts
+
 
+def warm_up() -> bool:
+    """Load artifacts at startup so the first request does not pay for it"""
+    try:
+        get_artifacts()
+        return True
+    except Exception as e:
+        print(f"Crop model artifacts not loaded, using fallback predictions: {e}")
+        return False
+
+
+def reload_artifacts(force: bool = False) -> Dict:
+    """Reload artifacts if the .pkl files changed on disk and swap them in atomically"""
+    paths = _resolve_artifact_paths()
+    stamp = _stamp(paths)
+    if not force and stamp == _artifact_stamp:
+        return {**model_status(), "reloaded": False}
+    artifacts = _load_artifacts(paths)
+    with _registry_lock:
+        _install_artifacts(artifacts, stamp)
+    return {**model_status(), "reloaded": True}
+
+
+def model_status() -> Dict:
+    return {
+        "loaded": _artifacts is not None,
+        "loaded_at": _loaded_at,
+        "error": str(_load_error) if _load_error else None,
+        "artifacts": [path for path, _, _ in _artifact_stamp] if _artifact_stamp else [],
+    }
+
+
+def _install_artifacts(artifacts: Tuple[object, object, object, object], stamp: Tuple) -> None:
+    global _artifacts, _artifact_stamp, _loaded_at, _load_error
+    _artifacts = artifacts
+    _load_error = None
+    _artifact_stamp = stamp
+    _loaded_at = time.time()
+    # Cached results came from the previous model
+    prediction_cache.clear()
+
+
+def _resolve_artifact_paths() -> List[str]:
     def find_file(candidates):
-        for d in search_dirs:
+        for d in _SEARCH_DIRS:
             for name in candidates:
                 path = os.path.join(d, name)
                 if os.path.exists(path):
                     return path
         raise FileNotFoundError(f"Artifacts not found: {candidates}")
 
-    model_path = find_file(["xgb_crop_model.pkl", "xgb_crop_model (1).pkl"])
-    scaler_path = find_file(["scaler.pkl", "scaler (1).pkl"])
-    crop_enc_path = find_file(["crop_encoder.pkl", "crop_encoder (1).pkl"])
-    croptype_enc_path = find_file(["croptype_encoder.pkl", "croptype_encoder (1).pkl"])
-
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
-    with open(scaler_path, "rb") as f:
-        scaler = pickle.load(f)
-    with open(crop_enc_path, "rb") as f:
-        le_crop = pickle.load(f)
-    with open(croptype_enc_path, "rb") as f:
-        le_crop_type = pickle.load(f)
+    return [find_file(candidates) for candidates in _ARTIFACT_CANDIDATES.values()]
+
+
+def _stamp(paths: List[str]) -> Tuple:
+    stamp = []
+    for path in paths:
+        st = os.stat(path)
+        stamp.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def _load_artifacts(paths: List[str]) -> Tuple[object, object, object, object]:
+    loaded = []
+    for path in paths:
+        with open(path, "rb") as f:
+            loaded.append(pickle.load(f))
+    model, scaler, le_crop, le_crop_type = loaded
     return model, scaler, le_crop, le_crop_type
 
 
@@ -69,16 +241,36 @@ def _encode_crop_type(le_crop_type, crop_type: str) -> int:
     try:
         return int(le_crop_type.transform([crop_type])[0])
     except Exception:
+        # Unseen crop types take the slot just past the known classes. The
+        # encoder is shared across requests, so it must not be mutated here.
         if hasattr(le_crop_type, "classes_"):
-            try:
-                import numpy as _np
-                le_crop_type.classes_ = _np.append(le_crop_type.classes_, crop_type)
-                return int(le_crop_type.transform([crop_type])[0])
-            except Exception:
-                pass
+            return len(le_crop_type.classes_)
         return 0
 
 
+def _encode_crop_types(le_crop_type, crop_types: List[str]):
+    """Encode a column of crop types with a single transform call"""
+    import numpy as _np
+    classes = getattr(le_crop_type, "classes_", None)
+    if classes is None:
+        return _np.array([_encode_crop_type(le_crop_type, c) for c in crop_types], dtype=float)
+    values = _np.asarray(crop_types, dtype=object)
+    known = _np.isin(values, _np.asarray(classes, dtype=object))
+    encoded = _np.full(len(values), len(classes), dtype=float)
+    if known.any():
+        encoded[known] = le_crop_type.transform(values[known])
+    return encoded
+
+
+def _inverse_crops(le_crop, preds) -> List[str]:
+    import numpy as _np
+    labels = _np.asarray(preds).astype(int).ravel()
+    try:
+        return [str(name) for name in le_crop.inverse_transform(labels)]
+    except Exception:
+        return [_inverse_crop(le_crop, int(label)) for label in labels]
+
+
 def _inverse_crop(le_crop, label: int) -> str:
     try:
         return str(le_crop.inverse_transform([label])[0])
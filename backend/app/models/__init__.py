@@ -3,8 +3,22 @@ from .farm import Farm
 from .expense import Expense
 from .yield_model import Yield
 from .chat_history import ChatHistory
-
-__all__ = ["User", "Farm", "Expense", "Yield", "ChatHistory"]
+from .farm_financials import FarmFinancials, FarmCategoryTotal, FarmMonthlyTotal
+from .report_job import ReportJob
+from .geocode_cache import GeocodeEntry
+
+__all__ = [
+    "User",
+    "Farm",
+    "Expense",
+    "Yield",
+    "ChatHistory",
+    "FarmFinancials",
+    "FarmCategoryTotal",
+    "FarmMonthlyTotal",
+    "ReportJob",
+    "GeocodeEntry",
+]
 
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Numeric, Date, DateTime, ForeignKey
+from sqlalchemy import Column, String, Numeric, Date, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -8,6 +8,12 @@ from app.utils.db_types import GUID
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Ledger listings and trends: filter by farm, order/group by date
+        Index("ix_expenses_farm_id_date", "farm_id", "date"),
+        # By-category totals and SUM(amount) answered from the index alone
+        Index("ix_expenses_farm_id_category_amount", "farm_id", "category", "amount"),
+    )
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     farm_id = Column(GUID(), ForeignKey("farms.id"), nullable=False)
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Numeric, Date, DateTime, Integer, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+from app.utils.db_types import GUID
+
+
+class FarmFinancials(Base):
+    """Running expense/income totals per farm, maintained on every write"""
+    __tablename__ = "farm_financials"
+
+    farm_id = Column(GUID(), ForeignKey("farms.id"), primary_key=True)
+    total_expenses = Column(Numeric(14, 2), nullable=False, default=0)
+    total_income = Column(Numeric(14, 2), nullable=False, default=0)
+    expense_count = Column(Integer, nullable=False, default=0)
+    yield_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class FarmCategoryTotal(Base):
+    """Running expense total per farm and category"""
+    __tablename__ = "farm_category_totals"
+
+    farm_id = Column(GUID(), ForeignKey("farms.id"), primary_key=True)
+    category = Column(String, primary_key=True)
+    amount = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class FarmMonthlyTotal(Base):
+    """Running expense/income totals per farm and calendar month (first day of the month)"""
+    __tablename__ = "farm_monthly_totals"
+
+    farm_id = Column(GUID(), ForeignKey("farms.id"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    expenses = Column(Numeric(14, 2), nullable=False, default=0)
+    income = Column(Numeric(14, 2), nullable=False, default=0)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class GeocodeEntry(Base):
+    """Cached geocoding result keyed by normalized city name; null coordinates mark an unknown name"""
+    __tablename__ = "geocode_cache"
+
+    key = Column(String, primary_key=True)
+    query = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+from app.utils.db_types import GUID
+
+
+class ReportJob(Base):
+    """Queued PDF report render; ``available_at`` is the retry time or, while running, the lease expiry"""
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        # Workers claim the oldest available job
+        Index("ix_report_jobs_status_available_at", "status", "available_at"),
+        # Dedupe: one live job per farm, report kind and data version
+        Index("ix_report_jobs_farm_id_kind_data_version", "farm_id", "kind", "data_version"),
+    )
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
+    farm_id = Column(GUID(), ForeignKey("farms.id"), nullable=False)
+    kind = Column(String, nullable=False)
+    data_version = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False)
+    file_path = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Numeric, Date, DateTime, ForeignKey
+from sqlalchemy import Column, String, Numeric, Date, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -8,6 +8,10 @@ from app.utils.db_types import GUID
 
 class Yield(Base):
     __tablename__ = "yields"
+    __table_args__ = (
+        # Ledger listings by date and SUM(total_income) answered from the index alone
+        Index("ix_yields_farm_id_date_total_income", "farm_id", "date", "total_income"),
+    )
 
     id = Column(GUID(), primary_key=True, default=uuid.uuid4)
     farm_id = Column(GUID(), ForeignKey("farms.id"), nullable=False)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from app.database import get_db
 from app.models.user import User
@@ -14,18 +15,28 @@ from app.schemas.auth_schemas import (
     RefreshTokenRequest,
     RefreshTokenResponse,
 )
-from app.utils.otp_handler import generate_otp, send_otp_via_twilio, store_otp, verify_otp
+from app.utils.otp_handler import generate_otp, send_otp, store_otp, verify_otp
 from app.utils.jwt_handler import create_access_token, create_refresh_token, verify_token
+from app.utils.principal_cache import principal_cache
+from app.utils.rate_limit import rate_limit
 import uuid
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=RegisterResponse)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+def _send_otp(phone: str, otp: str) -> None:
+    if not send_otp(phone, otp):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="OTP service is busy, please try again shortly"
+        )
+
+
+@router.post("/register", response_model=RegisterResponse, dependencies=[Depends(rate_limit("auth.register"))])
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
     """Register a new user and send OTP"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.phone == request.phone).first()
+    existing_user = await db.scalar(select(User).where(User.phone == request.phone))
     
     if existing_user and existing_user.is_active:
         raise HTTPException(
@@ -50,19 +61,21 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         db.add(user)
     
     try:
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Phone number already exists"
         )
+    # A re-registered account is inactive until its OTP is verified again
+    principal_cache.invalidate(user.id)
     
     # Generate and send OTP
     otp = generate_otp()
-    store_otp(request.phone, otp)
-    send_otp_via_twilio(request.phone, otp)
+    await store_otp(request.phone, otp)
+    _send_otp(request.phone, otp)
     
     return RegisterResponse(
         status="otp_sent",
@@ -71,12 +84,12 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/request-otp", response_model=RequestOTPResponse)
+@router.post("/request-otp", response_model=RequestOTPResponse, dependencies=[Depends(rate_limit("auth.request_otp"))])
 async def request_otp(request: RequestOTPRequest):
     """Request OTP for login"""
     otp = generate_otp()
-    store_otp(request.phone, otp)
-    send_otp_via_twilio(request.phone, otp)
+    await store_otp(request.phone, otp)
+    _send_otp(request.phone, otp)
     
     return RequestOTPResponse(
         status="otp_sent",
@@ -84,18 +97,18 @@ async def request_otp(request: RequestOTPRequest):
     )
 
 
-@router.post("/verify-otp", response_model=VerifyOTPResponse)
-async def verify_otp_endpoint(request: VerifyOTPRequest, db: Session = Depends(get_db)):
+@router.post("/verify-otp", response_model=VerifyOTPResponse, dependencies=[Depends(rate_limit("auth.verify_otp"))])
+async def verify_otp_endpoint(request: VerifyOTPRequest, db: AsyncSession = Depends(get_db)):
     """Verify OTP and activate user"""
     # Verify OTP
-    if not verify_otp(request.phone, request.otp):
+    if not await verify_otp(request.phone, request.otp):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired OTP"
         )
     
     # Get or create user
-    user = db.query(User).filter(User.phone == request.phone).first()
+    user = await db.scalar(select(User).where(User.phone == request.phone))
     
     if not user:
         raise HTTPException(
@@ -105,8 +118,9 @@ async def verify_otp_endpoint(request: VerifyOTPRequest, db: Session = Depends(g
     
     # Activate user
     user.is_active = True
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.mark_active(user.id)
     
     # Generate JWT tokens
     token_data = {"sub": str(user.id), "phone": user.phone}
@@ -124,7 +138,7 @@ async def verify_otp_endpoint(request: VerifyOTPRequest, db: Session = Depends(g
 @router.post("/refresh", response_model=RefreshTokenResponse)
 async def refresh_tokens(
     request: RefreshTokenRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Refresh access token using refresh token"""
     payload = verify_token(request.refresh_token, token_type="refresh")
@@ -141,7 +155,7 @@ async def refresh_tokens(
             detail="Invalid token payload"
         )
 
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await db.scalar(select(User).where(User.id == user_id, User.is_active == True))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from uuid import UUID
 from app.database import get_db
 from app.models.farm import Farm
 from app.schemas.report_schemas import ExpenseChartResponse, ChartDataPoint
+from app.services.rollup_service import get_farm_data_stamp
 from app.utils.profit_calculator import get_expense_trends
+from app.utils.response_cache import cached_json
 from app.routes.farms import get_current_user_id
 
 router = APIRouter(prefix="/charts", tags=["Charts"])
@@ -13,11 +17,15 @@ router = APIRouter(prefix="/charts", tags=["Charts"])
 
 @router.get("/expenses", response_model=ExpenseChartResponse)
 async def get_expense_chart(
+    request: Request,
     farmId: str = Query(..., alias="farmId"),
-    from_date: Optional[str] = Query(None, alias="from"),
-    to_date: Optional[str] = Query(None, alias="to"),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    bucket: str = Query("day", pattern="^(day|week|month|season)$"),
+    fill: bool = Query(False, description="Include empty buckets with a zero total"),
+    cumulative: bool = Query(False, description="Add a running total to each point"),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get expense trends chart data for a farm"""
     try:
@@ -28,10 +36,10 @@ async def get_expense_chart(
             detail="Invalid farm ID format"
         )
     # Verify farm belongs to user
-    farm = db.query(Farm).filter(
+    farm = await db.scalar(select(Farm).where(
         Farm.id == farm_uuid,
         Farm.user_id == current_user_id
-    ).first()
+    ))
     
     if not farm:
         raise HTTPException(
@@ -39,11 +47,19 @@ async def get_expense_chart(
             detail="Farm not found"
         )
     
-    chart_data = get_expense_trends(db, farm_uuid, from_date, to_date)
-    
-    return ExpenseChartResponse(
-        farm_id=farm_uuid,
-        chart_type="line",
-        data=[ChartDataPoint(**item) for item in chart_data]
-    )
+    async def build():
+        try:
+            chart_data = await get_expense_trends(db, farm_uuid, from_date, to_date, bucket, fill, cumulative)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        return ExpenseChartResponse(
+            farm_id=farm_uuid,
+            chart_type="line",
+            data=[ChartDataPoint(**item) for item in chart_data]
+        )
+
+    return await cached_json(request, current_user_id, await get_farm_data_stamp(db, farm_uuid), build)
 
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import os
 from app.database import get_db
@@ -18,14 +19,15 @@ async def chatbot_health():
 
 
 @router.get("/history")
-async def get_history(current_user_id: UUID = Depends(get_current_user_id), db: Session = Depends(get_db)):
+async def get_history(current_user_id: UUID = Depends(get_current_user_id), db: AsyncSession = Depends(get_db)):
     items = (
-        db.query(ChatHistory)
-        .filter(ChatHistory.user_id == current_user_id)
-        .order_by(ChatHistory.created_at.desc())
-        .limit(50)
-        .all()
-    )
+        await db.scalars(
+            select(ChatHistory)
+            .where(ChatHistory.user_id == current_user_id)
+            .order_by(ChatHistory.created_at.desc())
+            .limit(50)
+        )
+    ).all()
     return [
         {
             "id": str(i.id),
@@ -42,14 +44,14 @@ async def post_message(
     message: str = Form(...),
     context: str | None = Form(None),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     result = await send_message(message, context)
     reply = result.get("reply", "")
     item = ChatHistory(user_id=current_user_id, message=message, response=reply)
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
     return {"reply": reply, "history_id": str(item.id)}
 
 
@@ -57,7 +59,7 @@ async def post_message(
 async def identify(
     image: UploadFile = File(...),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     data = await image.read()
     result = await identify_image(data)
@@ -79,6 +81,6 @@ async def identify(
 
     item = ChatHistory(user_id=current_user_id, message=f"[identify] {image.filename}", response=summary)
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
     return {"result": result, "history_id": str(item.id)}
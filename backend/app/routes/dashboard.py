@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.database import get_db
 from app.models.farm import Farm
-from app.schemas.report_schemas import FarmSummaryResponse
+from app.schemas.report_schemas import FarmSummaryResponse, PortfolioResponse
+from app.services.portfolio_service import get_portfolio
+from app.services.rollup_service import get_farm_data_stamp
 from app.utils.profit_calculator import calculate_farm_profit
+from app.utils.response_cache import cached_json
 from app.routes.farms import get_current_user_id
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
@@ -12,9 +16,10 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 @router.get("/farm-summary", response_model=FarmSummaryResponse)
 async def get_farm_summary(
+    request: Request,
     farmId: str = Query(..., alias="farmId"),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get farm profit/loss summary for dashboard"""
     try:
@@ -25,10 +30,10 @@ async def get_farm_summary(
             detail="Invalid farm ID format"
         )
     # Verify farm belongs to user
-    farm = db.query(Farm).filter(
+    farm = await db.scalar(select(Farm).where(
         Farm.id == farm_uuid,
         Farm.user_id == current_user_id
-    ).first()
+    ))
     
     if not farm:
         raise HTTPException(
@@ -36,14 +41,24 @@ async def get_farm_summary(
             detail="Farm not found"
         )
     
-    profit_data = calculate_farm_profit(db, farm_uuid)
-    
-    return FarmSummaryResponse(
-        farm_id=farm_uuid,
-        total_expense=profit_data["total_expenses"],
-        total_income=profit_data["total_income"],
-        net_profit=profit_data["net_profit"],
-        profit_status=profit_data["profit_status"],
-        profit_percentage=profit_data["profit_percentage"]
-    )
+    async def build():
+        profit_data = await calculate_farm_profit(db, farm_uuid)
+        return FarmSummaryResponse(
+            farm_id=farm_uuid,
+            total_expense=profit_data["total_expenses"],
+            total_income=profit_data["total_income"],
+            net_profit=profit_data["net_profit"],
+            profit_status=profit_data["profit_status"],
+            profit_percentage=profit_data["profit_percentage"]
+        )
+
+    return await cached_json(request, current_user_id, await get_farm_data_stamp(db, farm_uuid), build)
 
+
+@router.get("/portfolio", response_model=PortfolioResponse)
+async def get_portfolio_summary(
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get profit, top expense categories and recent trend for all of the user's farms"""
+    return await get_portfolio(db, current_user_id)
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.database import get_db
 from app.models.expense import Expense
 from app.models.farm import Farm
 from app.schemas.expense_schemas import ExpenseCreate, ExpenseResponse
 from app.routes.farms import get_current_user_id
+from app.utils.pagination import LedgerPage, ledger_page_params, fetch_ledger_page
+from app.services.rollup_service import record_expense
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"])
 
@@ -14,14 +17,14 @@ router = APIRouter(prefix="/expenses", tags=["Expenses"])
 async def create_expense(
     expense_data: ExpenseCreate,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new expense"""
     # Verify farm belongs to user
-    farm = db.query(Farm).filter(
+    farm = await db.scalar(select(Farm).where(
         Farm.id == expense_data.farm_id,
         Farm.user_id == current_user_id
-    ).first()
+    ))
     
     if not farm:
         raise HTTPException(
@@ -38,8 +41,9 @@ async def create_expense(
         note=expense_data.note
     )
     db.add(expense)
-    db.commit()
-    db.refresh(expense)
+    await record_expense(db, expense.farm_id, expense.category, expense.date, expense.amount)
+    await db.commit()
+    await db.refresh(expense)
     
     return expense
 
@@ -47,10 +51,12 @@ async def create_expense(
 @router.get("/farm/{farm_id}", response_model=list[ExpenseResponse])
 async def get_farm_expenses(
     farm_id: str,
+    response: Response,
+    page: LedgerPage = Depends(ledger_page_params),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all expenses for a specific farm"""
+    """Get a page of expenses for a specific farm, newest first"""
     try:
         farm_uuid = UUID(farm_id)
     except ValueError:
@@ -59,10 +65,10 @@ async def get_farm_expenses(
             detail="Invalid farm ID format"
         )
     # Verify farm belongs to user
-    farm = db.query(Farm).filter(
+    farm = await db.scalar(select(Farm).where(
         Farm.id == farm_uuid,
         Farm.user_id == current_user_id
-    ).first()
+    ))
     
     if not farm:
         raise HTTPException(
@@ -70,6 +76,8 @@ async def get_farm_expenses(
             detail="Farm not found"
         )
     
-    expenses = db.query(Expense).filter(Expense.farm_id == farm_uuid).all()
+    expenses = await fetch_ledger_page(
+        db, Expense, select(Expense).where(Expense.farm_id == farm_uuid), page, response
+    )
     return expenses
 
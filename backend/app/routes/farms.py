@@ -1,8 +1,8 @@
-import io
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from datetime import date
+from typing import List, Optional
 from uuid import UUID
 from app.database import get_db
 from app.models.farm import Farm
@@ -12,16 +12,27 @@ from app.models.user import User
 from app.schemas.farm_schemas import FarmCreate, FarmListItem, FarmDetailResponse
 from app.schemas.expense_schemas import FarmExpenseCreate, FarmExpenseItem
 from app.schemas.yield_schemas import FarmYieldCreate, FarmYieldItem
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from app.utils.jwt_handler import verify_token
-from app.utils.profit_calculator import calculate_farm_profit
+from app.utils.profit_calculator import calculate_farm_profit, get_expense_trends
+from app.utils.principal_cache import principal_cache
+from app.utils.response_cache import cached_json
+from app.utils.pagination import LedgerPage, ledger_page_params, fetch_ledger_page
+from app.services.ledger_export import (
+    EXPENSE_EXPORT_FIELDS,
+    YIELD_EXPORT_FIELDS,
+    EXPORT_MEDIA_TYPES,
+    stream_ledger,
+)
+from app.services.report_service import build_report
+from app.services.rollup_service import record_expense, record_yield, category_totals, get_farm_data_stamp
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter(prefix="/farms", tags=["Farms"])
 security = HTTPBearer()
 
 
-def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)):
     """Dependency to get current user ID from JWT token"""
     token = credentials.credentials
     payload = verify_token(token)
@@ -43,13 +54,16 @@ def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(secu
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token"
         )
+    if principal_cache.is_active(user_id):
+        return user_id
     # Verify user exists and is active
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await db.scalar(select(User.id).where(User.id == user_id, User.is_active == True))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
+    principal_cache.mark_active(user_id)
     return user_id
 
 
@@ -73,19 +87,18 @@ def _serialize_farm(farm: Farm) -> FarmListItem:
     )
 
 
-def _serialize_farm_detail(farm: Farm, db: Session) -> FarmDetailResponse:
-    profit = calculate_farm_profit(db, farm.id)
-    total_yield = float(db.query(func.sum(Yield.total_income)).filter(Yield.farm_id == farm.id).scalar() or 0)
+async def _serialize_farm_detail(farm: Farm, db: AsyncSession) -> FarmDetailResponse:
+    profit = await calculate_farm_profit(db, farm.id)
     return FarmDetailResponse(
         **_serialize_farm(farm).model_dump(),
         total_expenses=profit["total_expenses"],
-        total_yield=total_yield,
+        total_yield=profit["total_income"],
         net_profit=profit["net_profit"],
         profit_margin=profit["profit_percentage"],
     )
 
 
-def _get_farm_for_user(db: Session, farm_id: str, user_id: UUID) -> Farm:
+async def _get_farm_for_user(db: AsyncSession, farm_id: str, user_id: UUID) -> Farm:
     try:
         farm_uuid = UUID(farm_id)
     except ValueError:
@@ -93,7 +106,7 @@ def _get_farm_for_user(db: Session, farm_id: str, user_id: UUID) -> Farm:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid farm ID format"
         )
-    farm = db.query(Farm).filter(Farm.id == farm_uuid, Farm.user_id == user_id).first()
+    farm = await db.scalar(select(Farm).where(Farm.id == farm_uuid, Farm.user_id == user_id))
     if not farm:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,33 +115,15 @@ def _get_farm_for_user(db: Session, farm_id: str, user_id: UUID) -> Farm:
     return farm
 
 
-PDF_PLACEHOLDER = (
-    b"%PDF-1.4\n"
-    b"1 0 obj<</Type /Catalog /Pages 2 0 R>>endobj\n"
-    b"2 0 obj<</Type /Pages /Kids [3 0 R] /Count 1>>endobj\n"
-    b"3 0 obj<</Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources<</Font<</F1 5 0 R>>>>>>endobj\n"
-    b"4 0 obj<</Length 44>>stream\n"
-    b"BT /F1 18 Tf 72 720 Td (AgriSmart Report) Tj ET\n"
-    b"endstream\nendobj\n"
-    b"5 0 obj<</Type /Font /Subtype /Type1 /BaseFont /Helvetica>>endobj\n"
-    b"xref\n0 6\n"
-    b"0000000000 65535 f \n"
-    b"0000000010 00000 n \n"
-    b"0000000059 00000 n \n"
-    b"0000000110 00000 n \n"
-    b"0000000231 00000 n \n"
-    b"0000000321 00000 n \n"
-    b"trailer<</Size 6/Root 1 0 R>>\n"
-    b"startxref\n"
-    b"390\n"
-    b"%%EOF"
-)
+async def _pdf_response(db: AsyncSession, farm: Farm, kind: str, filename: str) -> FileResponse:
+    path = await build_report(db, farm, kind)
+    return FileResponse(path, media_type="application/pdf", filename=filename)
 
 
-def _pdf_response(filename: str) -> StreamingResponse:
+def _export_response(rows, filename: str, fmt: str) -> StreamingResponse:
     return StreamingResponse(
-        io.BytesIO(PDF_PLACEHOLDER),
-        media_type="application/pdf",
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
@@ -137,7 +132,7 @@ def _pdf_response(filename: str) -> StreamingResponse:
 async def create_farm(
     farm_data: FarmCreate,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new farm"""
     farm = Farm(
@@ -150,51 +145,68 @@ async def create_farm(
         lon=farm_data.location.lon if farm_data.location else None
     )
     db.add(farm)
-    db.commit()
-    db.refresh(farm)
+    await db.commit()
+    await db.refresh(farm)
     
-    return _serialize_farm_detail(farm, db)
+    return await _serialize_farm_detail(farm, db)
 
 
 @router.get("", response_model=List[FarmListItem])
 async def get_farms(
+    request: Request,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all farms for the current user"""
-    farms = db.query(Farm).filter(Farm.user_id == current_user_id).all()
-    return [_serialize_farm(farm) for farm in farms]
+    # Farms are only ever added, so count and newest creation time identify the list
+    count, newest = (await db.execute(
+        select(func.count(Farm.id), func.max(Farm.created_at)).where(Farm.user_id == current_user_id)
+    )).one()
+
+    async def build():
+        farms = (await db.scalars(select(Farm).where(Farm.user_id == current_user_id))).all()
+        return [_serialize_farm(farm) for farm in farms]
+
+    return await cached_json(request, current_user_id, (f"{count}:{newest}", newest), build)
 
 
 @router.get("/{farm_id}", response_model=FarmDetailResponse)
 async def get_farm(
     farm_id: str,
+    request: Request,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific farm"""
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
-    return _serialize_farm_detail(farm, db)
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return await cached_json(
+        request, current_user_id, await get_farm_data_stamp(db, farm.id),
+        lambda: _serialize_farm_detail(farm, db),
+    )
 
 
 @router.get("/{farm_id}/summary", response_model=FarmDetailResponse)
 async def get_farm_summary(
     farm_id: str,
+    request: Request,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
-    return _serialize_farm_detail(farm, db)
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return await cached_json(
+        request, current_user_id, await get_farm_data_stamp(db, farm.id),
+        lambda: _serialize_farm_detail(farm, db),
+    )
 
 
 @router.get("/{farm_id}/summary/pdf")
 async def download_farm_summary_pdf(
     farm_id: str,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    _get_farm_for_user(db, farm_id, current_user_id)
-    return _pdf_response(f"farm-{farm_id}-summary.pdf")
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return await _pdf_response(db, farm, "summary", f"farm-{farm_id}-summary.pdf")
 
 
 @router.post("/{farm_id}/expenses", response_model=FarmExpenseItem, status_code=status.HTTP_201_CREATED)
@@ -202,9 +214,9 @@ async def add_farm_expense(
     farm_id: str,
     expense_data: FarmExpenseCreate,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
     expense = Expense(
         farm_id=farm.id,
         crop_name=expense_data.crop or farm.farm_type or "General",
@@ -214,8 +226,9 @@ async def add_farm_expense(
         note=expense_data.description
     )
     db.add(expense)
-    db.commit()
-    db.refresh(expense)
+    await record_expense(db, farm.id, expense.category, expense.date, expense.amount)
+    await db.commit()
+    await db.refresh(expense)
     return FarmExpenseItem(
         id=expense.id,
         category=expense.category,
@@ -228,11 +241,15 @@ async def add_farm_expense(
 @router.get("/{farm_id}/expenses", response_model=List[FarmExpenseItem])
 async def list_farm_expenses(
     farm_id: str,
+    response: Response,
+    page: LedgerPage = Depends(ledger_page_params),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
-    expenses = db.query(Expense).filter(Expense.farm_id == farm.id).order_by(Expense.date.desc()).all()
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    expenses = await fetch_ledger_page(
+        db, Expense, select(Expense).where(Expense.farm_id == farm.id), page, response
+    )
     return [
         FarmExpenseItem(
             id=expense.id,
@@ -245,69 +262,91 @@ async def list_farm_expenses(
     ]
 
 
+@router.get("/{farm_id}/expenses/export")
+async def export_farm_expenses(
+    farm_id: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream the full expense ledger as CSV or NDJSON"""
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return _export_response(
+        stream_ledger(Expense, EXPENSE_EXPORT_FIELDS, farm.id, format),
+        f"farm-{farm_id}-expenses.{format}",
+        format,
+    )
+
+
 @router.get("/{farm_id}/expenses/by-category")
 async def expenses_by_category(
     farm_id: str,
+    request: Request,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
-    results = (
-        db.query(
-            Expense.category,
-            func.sum(Expense.amount).label("total")
-        )
-        .filter(Expense.farm_id == farm.id)
-        .group_by(Expense.category)
-        .all()
-    )
-    return [
-        {"category": row.category or "Uncategorized", "amount": float(row.total or 0)}
-        for row in results
-    ]
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+
+    async def build():
+        return [
+            {"category": category or "Uncategorized", "amount": float(total)}
+            for category, total in await category_totals(db, farm.id)
+        ]
+
+    return await cached_json(request, current_user_id, await get_farm_data_stamp(db, farm.id), build)
 
 
 @router.get("/{farm_id}/expenses/trend")
 async def expenses_trend(
     farm_id: str,
+    request: Request,
+    bucket: str = Query("month", pattern="^(day|week|month|season)$"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    fill: bool = Query(True, description="Include empty buckets with zero expenses"),
+    cumulative: bool = Query(False, description="Add a running total to each point"),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
-    results = (
-        db.query(
-            Expense.date.label("date"),
-            func.sum(Expense.amount).label("total")
-        )
-        .filter(Expense.farm_id == farm.id)
-        .group_by(Expense.date)
-        .order_by(Expense.date)
-        .all()
-    )
-    return [
-        {"month": row.date.strftime("%Y-%m"), "expenses": float(row.total or 0)}
-        for row in results
-    ]
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+
+    async def build():
+        try:
+            points = await get_expense_trends(db, farm.id, date_from, date_to, bucket, fill, cumulative)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        trend = []
+        for point in points:
+            item = {"month": point["label"], "expenses": point["total"]}
+            if cumulative:
+                item["cumulative"] = point["cumulative"]
+            trend.append(item)
+        return trend
+
+    return await cached_json(request, current_user_id, await get_farm_data_stamp(db, farm.id), build)
 
 
 @router.get("/{farm_id}/expenses/report/pdf")
 async def download_expense_report_pdf(
     farm_id: str,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    _get_farm_for_user(db, farm_id, current_user_id)
-    return _pdf_response(f"farm-{farm_id}-expenses.pdf")
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return await _pdf_response(db, farm, "expenses", f"farm-{farm_id}-expenses.pdf")
 
 
 @router.get("/{farm_id}/expenses/graph/pdf")
 async def download_expense_graph_pdf(
     farm_id: str,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    _get_farm_for_user(db, farm_id, current_user_id)
-    return _pdf_response(f"farm-{farm_id}-expenses-graph.pdf")
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return await _pdf_response(db, farm, "expenses-graph", f"farm-{farm_id}-expenses-graph.pdf")
 
 
 @router.post("/{farm_id}/yield", response_model=FarmYieldItem, status_code=status.HTTP_201_CREATED)
@@ -315,9 +354,9 @@ async def add_farm_yield(
     farm_id: str,
     yield_data: FarmYieldCreate,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
     unit_normalized = (yield_data.unit or "kg").lower()
     if unit_normalized in {"kg", "kilogram", "kilograms"}:
         quantity_in_kg = yield_data.quantity
@@ -337,8 +376,9 @@ async def add_farm_yield(
         buyer_notes=yield_data.notes
     )
     db.add(yield_record)
-    db.commit()
-    db.refresh(yield_record)
+    await record_yield(db, farm.id, yield_record.date, yield_record.total_income)
+    await db.commit()
+    await db.refresh(yield_record)
     return FarmYieldItem(
         id=yield_record.id,
         crop_name=yield_record.crop_name,
@@ -355,11 +395,15 @@ async def add_farm_yield(
 @router.get("/{farm_id}/yield", response_model=List[FarmYieldItem])
 async def list_farm_yield(
     farm_id: str,
+    response: Response,
+    page: LedgerPage = Depends(ledger_page_params),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    farm = _get_farm_for_user(db, farm_id, current_user_id)
-    yields = db.query(Yield).filter(Yield.farm_id == farm.id).order_by(Yield.date.desc()).all()
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    yields = await fetch_ledger_page(
+        db, Yield, select(Yield).where(Yield.farm_id == farm.id), page, response
+    )
     items: List[FarmYieldItem] = []
     for y in yields:
         items.append(
@@ -378,12 +422,28 @@ async def list_farm_yield(
     return items
 
 
+@router.get("/{farm_id}/yield/export")
+async def export_farm_yield(
+    farm_id: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream the full yield ledger as CSV or NDJSON"""
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return _export_response(
+        stream_ledger(Yield, YIELD_EXPORT_FIELDS, farm.id, format),
+        f"farm-{farm_id}-yield.{format}",
+        format,
+    )
+
+
 @router.get("/{farm_id}/profit/report/pdf")
 async def download_profit_report_pdf(
     farm_id: str,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    _get_farm_for_user(db, farm_id, current_user_id)
-    return _pdf_response(f"farm-{farm_id}-profit.pdf")
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    return await _pdf_response(db, farm, "profit", f"farm-{farm_id}-profit.pdf")
 
@@ -1,41 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+import asyncio
+import hmac
+import json
+from typing import Dict, Optional
+import httpx
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import AsyncSessionLocal, get_db
 from app.models.farm import Farm
-from app.services.area_service import to_hectares, geocode_city
-from app.services.weather_service import fetch_weather
-from app.ml.model_service import run_crop_prediction
-from app.schemas.predict_schema import CropPredictRequest, CropPredictResponse, CropRecommendRequest
+from app.services.area_service import to_hectares
+from app.services.geocode_cache import geocode_cache, lookup_city
+from app.services.weather_service import fetch_weather, weather_cache
+from app.ml.model_service import run_crop_prediction_batch, reload_artifacts, model_status
+from app.ml.batcher import prediction_batcher
+from app.ml.prediction_cache import prediction_cache
+from app.utils.stage_timer import StageStats, StageTimer
+from app.schemas.predict_schema import (
+    CropPredictRequest,
+    CropPredictResponse,
+    CropBatchPredictRequest,
+    CropBatchPredictResponse,
+    CropRecommendRequest,
+)
 
 router = APIRouter(prefix="/prediction", tags=["Prediction"])
 
+recommendation_stages = StageStats()
+
 
 @router.get("/health")
 async def prediction_health():
     return {"status": "ok"}
 
 
+@router.get("/model")
+async def get_model_status():
+    return model_status()
+
+
+@router.get("/metrics")
+async def prediction_metrics():
+    return {
+        "scheduler": prediction_batcher.metrics(),
+        "prediction_cache": prediction_cache.stats(),
+        "geocode_cache": geocode_cache.stats(),
+        "weather_cache": weather_cache.stats(),
+        "recommendation_stages": recommendation_stages.metrics(),
+    }
+
+
+def require_ops_token(x_ops_token: Optional[str] = Header(None)) -> None:
+    """Dependency for operator-only routes; disabled unless OPS_API_TOKEN is set"""
+    if not settings.OPS_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operator API is disabled")
+    if not x_ops_token or not hmac.compare_digest(x_ops_token, settings.OPS_API_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid operator token")
+
+
+@router.post("/model/reload", dependencies=[Depends(require_ops_token)])
+def reload_model(force: bool = False):
+    """Reload the crop model artifacts if they changed on disk"""
+    try:
+        return reload_artifacts(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+
+
 @router.post("/crop", response_model=CropPredictResponse)
 async def crop_predict(payload: CropPredictRequest):
     try:
-        result = run_crop_prediction(payload.model_dump())
+        result = await prediction_batcher.submit(payload.model_dump())
         return CropPredictResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/recommendation", response_model=CropPredictResponse)
-async def crop_recommend(payload: CropRecommendRequest, db: Session = Depends(get_db)):
-    farm: Farm | None = db.query(Farm).filter(Farm.id == payload.farm_id).first()
-    if not farm:
-        raise HTTPException(status_code=404, detail="Farm not found")
+@router.post("/crop/batch", response_model=CropBatchPredictResponse)
+async def crop_predict_batch(
+    payload: CropBatchPredictRequest,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Score many soil samples at once; format=ndjson streams results as they are computed"""
+    if len(payload.rows) > settings.PREDICTION_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.PREDICTION_BATCH_MAX_ROWS} rows per batch"
+        )
+    rows = [row.model_dump() for row in payload.rows]
+    if format == "ndjson":
+        return StreamingResponse(_stream_batch_predictions(rows), media_type="application/x-ndjson")
+    try:
+        results = await run_in_threadpool(run_crop_prediction_batch, rows)
+        return CropBatchPredictResponse(results=[CropPredictResponse(**r) for r in results])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _stream_batch_predictions(rows):
+    # A sync generator, so Starlette iterates it in a worker thread and each
+    # chunk's model call stays off the event loop.
+    chunk_size = max(1, settings.PREDICTION_BATCH_STREAM_CHUNK_ROWS)
+    for offset in range(0, len(rows), chunk_size):
+        results = run_crop_prediction_batch(rows[offset:offset + chunk_size])
+        yield "".join(
+            json.dumps({"index": offset + i, **result}) + "\n"
+            for i, result in enumerate(results)
+        )
 
-    area_h = to_hectares(float(farm.total_area), farm.area_unit)
-    coords = await geocode_city(payload.city)
+
+async def _city_weather(city: str, timer: StageTimer) -> Dict:
+    # Own session: this runs concurrently with the farm lookup on the request's session
+    async with AsyncSessionLocal() as db:
+        try:
+            coords = await timer.run("geocode", lookup_city(db, city))
+        except httpx.HTTPError:
+            raise HTTPException(status_code=503, detail="Geocoding service unavailable")
     if not coords:
         raise HTTPException(status_code=400, detail="City not found")
     lat, lon = coords
-    weather = await fetch_weather(lat, lon)
+    return await timer.run("weather", fetch_weather(lat, lon))
+
+
+@router.post("/recommendation", response_model=CropPredictResponse)
+async def crop_recommend(payload: CropRecommendRequest, response: Response, db: AsyncSession = Depends(get_db)):
+    """Farm lookup and geocode -> weather run concurrently; stage timings go in Server-Timing"""
+    timer = StageTimer()
+    weather_task = asyncio.ensure_future(_city_weather(payload.city, timer))
+    try:
+        farm: Farm | None = await timer.run("farm", db.scalar(select(Farm).where(Farm.id == payload.farm_id)))
+        if not farm:
+            raise HTTPException(status_code=404, detail="Farm not found")
+        area_h = to_hectares(float(farm.total_area), farm.area_unit)
+        weather = await weather_task
+    finally:
+        if not weather_task.done():
+            weather_task.cancel()
+        await asyncio.gather(weather_task, return_exceptions=True)
 
     model_input = {
         "crop_type": payload.crop_type,
@@ -47,10 +150,13 @@ async def crop_recommend(payload: CropRecommendRequest, db: Session = Depends(ge
         "temperature": weather["temperature"],
         "humidity": weather["humidity"],
         "rainfall": weather["rainfall"],
+        "top_k": payload.top_k,
     }
 
     try:
-        result = run_crop_prediction(model_input)
-        return CropPredictResponse(**result)
+        result = await timer.run("predict", prediction_batcher.submit(model_input))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    response.headers["Server-Timing"] = timer.header()
+    recommendation_stages.record(timer)
+    return CropPredictResponse(**result)
@@ -1,20 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from pathlib import Path
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.database import get_db
 from app.models.farm import Farm
-from app.schemas.report_schemas import FarmReportResponse
+from app.models.report_job import ReportJob
+from app.schemas.report_schemas import FarmReportResponse, ReportJobCreate, ReportJobResponse
+from app.services.report_jobs import enqueue_report
+from app.services.report_service import claim_cached_report
+from app.services.rollup_service import get_farm_data_stamp
 from app.utils.profit_calculator import calculate_farm_profit
-from app.routes.farms import get_current_user_id
+from app.utils.response_cache import cached_json
+from app.routes.farms import get_current_user_id, _get_farm_for_user
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
+# Job submission lives under the farm it renders
+farm_router = APIRouter(prefix="/farms", tags=["Reports"])
+
+
+def _serialize_job(job: ReportJob) -> ReportJobResponse:
+    return ReportJobResponse(
+        id=job.id,
+        farm_id=job.farm_id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        error=job.error,
+        download_url=f"/reports/jobs/{job.id}/download" if job.status == "done" else None,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+def _job_response(job: ReportJob) -> JSONResponse:
+    # 202 while the job is still queued or running, so clients know to poll again
+    code = status.HTTP_202_ACCEPTED if job.status in ("pending", "running") else status.HTTP_200_OK
+    return JSONResponse(status_code=code, content=_serialize_job(job).model_dump(mode="json"))
+
+
+async def _get_job_for_user(db: AsyncSession, job_id: str, user_id: UUID) -> ReportJob:
+    try:
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+    job = await db.scalar(select(ReportJob).where(ReportJob.id == job_uuid, ReportJob.user_id == user_id))
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job
 
 
 @router.get("/farm/{farm_id}", response_model=FarmReportResponse)
 async def get_farm_report(
     farm_id: str,
+    request: Request,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get profit/loss report for a specific farm"""
     try:
@@ -25,10 +73,10 @@ async def get_farm_report(
             detail="Invalid farm ID format"
         )
     # Verify farm belongs to user
-    farm = db.query(Farm).filter(
+    farm = await db.scalar(select(Farm).where(
         Farm.id == farm_uuid,
         Farm.user_id == current_user_id
-    ).first()
+    ))
     
     if not farm:
         raise HTTPException(
@@ -36,13 +84,64 @@ async def get_farm_report(
             detail="Farm not found"
         )
     
-    profit_data = calculate_farm_profit(db, farm_uuid)
-    
-    return FarmReportResponse(
-        farm_id=farm_uuid,
-        total_expenses=profit_data["total_expenses"],
-        total_income=profit_data["total_income"],
-        net_profit=profit_data["net_profit"],
-        profit_status=profit_data["profit_status"]
-    )
+    async def build():
+        profit_data = await calculate_farm_profit(db, farm_uuid)
+        return FarmReportResponse(
+            farm_id=farm_uuid,
+            total_expenses=profit_data["total_expenses"],
+            total_income=profit_data["total_income"],
+            net_profit=profit_data["net_profit"],
+            profit_status=profit_data["profit_status"]
+        )
 
+    return await cached_json(request, current_user_id, await get_farm_data_stamp(db, farm_uuid), build)
+
+
+@farm_router.post("/{farm_id}/reports", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    farm_id: str,
+    payload: ReportJobCreate = ReportJobCreate(),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a PDF report for background rendering"""
+    farm = await _get_farm_for_user(db, farm_id, current_user_id)
+    job = await enqueue_report(db, farm, current_user_id, payload.kind)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: str,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Poll a report job; ``download_url`` is set once the file is ready"""
+    job = await _get_job_for_user(db, job_id, current_user_id)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download the PDF produced by a finished report job"""
+    job = await _get_job_for_user(db, job_id, current_user_id)
+    if job.status != "done":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job is {job.status}"
+        )
+    if not job.file_path or not claim_cached_report(Path(job.file_path)):
+        # Superseded by a newer render after the farm's data changed
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Report is out of date; request a new one"
+        )
+    return FileResponse(
+        job.file_path,
+        media_type="application/pdf",
+        filename=f"farm-{job.farm_id}-{job.kind}.pdf",
+    )
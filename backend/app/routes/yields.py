@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
 from uuid import UUID
 from app.database import get_db
@@ -7,6 +8,8 @@ from app.models.yield_model import Yield
 from app.models.farm import Farm
 from app.schemas.yield_schemas import YieldCreate, YieldResponse
 from app.routes.farms import get_current_user_id
+from app.utils.pagination import LedgerPage, ledger_page_params, fetch_ledger_page
+from app.services.rollup_service import record_yield
 
 router = APIRouter(prefix="/yields", tags=["Yields"])
 
@@ -15,14 +18,14 @@ router = APIRouter(prefix="/yields", tags=["Yields"])
 async def create_yield(
     yield_data: YieldCreate,
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new yield (crop selling record)"""
     # Verify farm belongs to user
-    farm = db.query(Farm).filter(
+    farm = await db.scalar(select(Farm).where(
         Farm.id == yield_data.farm_id,
         Farm.user_id == current_user_id
-    ).first()
+    ))
     
     if not farm:
         raise HTTPException(
@@ -43,8 +46,9 @@ async def create_yield(
         buyer_notes=yield_data.buyer_notes
     )
     db.add(yield_record)
-    db.commit()
-    db.refresh(yield_record)
+    await record_yield(db, yield_record.farm_id, yield_record.date, yield_record.total_income)
+    await db.commit()
+    await db.refresh(yield_record)
     
     return yield_record
 
@@ -52,10 +56,12 @@ async def create_yield(
 @router.get("/farm/{farm_id}", response_model=list[YieldResponse])
 async def get_farm_yields(
     farm_id: str,
+    response: Response,
+    page: LedgerPage = Depends(ledger_page_params),
     current_user_id: UUID = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all yields for a specific farm"""
+    """Get a page of yields for a specific farm, newest first"""
     try:
         farm_uuid = UUID(farm_id)
     except ValueError:
@@ -64,10 +70,10 @@ async def get_farm_yields(
             detail="Invalid farm ID format"
         )
     # Verify farm belongs to user
-    farm = db.query(Farm).filter(
+    farm = await db.scalar(select(Farm).where(
         Farm.id == farm_uuid,
         Farm.user_id == current_user_id
-    ).first()
+    ))
     
     if not farm:
         raise HTTPException(
@@ -75,6 +81,8 @@ async def get_farm_yields(
             detail="Farm not found"
         )
     
-    yields = db.query(Yield).filter(Yield.farm_id == farm_uuid).all()
+    yields = await fetch_ledger_page(
+        db, Yield, select(Yield).where(Yield.farm_id == farm_uuid), page, response
+    )
     return yields
 
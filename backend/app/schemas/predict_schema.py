@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -11,12 +12,27 @@ class CropPredictRequest(BaseModel):
     rainfall: float = 0.0
     temperature: float = 0.0
     area_hectares: float = 1.0
+    top_k: Optional[int] = Field(default=None, ge=1, description="Ranked crops to return (default PREDICTION_TOP_K)")
+
+
+class CropProbability(BaseModel):
+    crop: str
+    probability: float
 
 
 class CropPredictResponse(BaseModel):
     recommended_crop: str
     expected_yield: float
     confidence: float
+    top_crops: List[CropProbability] = []
+
+
+class CropBatchPredictRequest(BaseModel):
+    rows: List[CropPredictRequest] = Field(..., min_length=1)
+
+
+class CropBatchPredictResponse(BaseModel):
+    results: List[CropPredictResponse]
 
 
 class CropRecommendRequest(BaseModel):
@@ -27,3 +43,4 @@ class CropRecommendRequest(BaseModel):
     k: float
     ph: float
     city: str
+    top_k: Optional[int] = Field(default=None, ge=1)
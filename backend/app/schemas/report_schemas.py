@@ -1,4 +1,6 @@
 from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
 from uuid import UUID
 
 
@@ -19,9 +21,43 @@ class FarmSummaryResponse(BaseModel):
     profit_percentage: float
 
 
+class CategoryAmount(BaseModel):
+    category: str
+    amount: float
+
+
+class PortfolioTrendPoint(BaseModel):
+    date: str
+    expenses: float
+    income: float
+
+
+class PortfolioTotals(BaseModel):
+    total_expense: float
+    total_income: float
+    net_profit: float
+    profit_status: str
+    profit_percentage: float
+
+
+class PortfolioFarmSummary(PortfolioTotals):
+    farm_id: UUID
+    name: str
+    top_categories: list[CategoryAmount]
+    trend: list[PortfolioTrendPoint]
+
+
+class PortfolioResponse(BaseModel):
+    farms: list[PortfolioFarmSummary]
+    totals: PortfolioTotals
+    trend_days: int
+
+
 class ChartDataPoint(BaseModel):
     date: str
     total: float
+    label: Optional[str] = None
+    cumulative: Optional[float] = None
 
 
 class ExpenseChartResponse(BaseModel):
@@ -30,3 +66,17 @@ class ExpenseChartResponse(BaseModel):
     data: list[ChartDataPoint]
 
 
+class ReportJobCreate(BaseModel):
+    kind: Literal["summary", "expenses", "expenses-graph", "profit"] = "summary"
+
+
+class ReportJobResponse(BaseModel):
+    id: UUID
+    farm_id: UUID
+    kind: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
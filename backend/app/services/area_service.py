@@ -1,5 +1,5 @@
 from typing import Optional, Tuple
-import httpx
+from app.utils.http_client import http_clients
 
 
 def to_hectares(value: float, unit: str) -> float:
@@ -10,14 +10,16 @@ def to_hectares(value: float, unit: str) -> float:
 
 
 async def geocode_city(name: str) -> Optional[Tuple[float, float]]:
-    url = f"https://geocoding-api.open-meteo.com/v1/search?name={name}"
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url)
-        if r.status_code >= 400:
-            return None
-        data = r.json()
-        results = data.get("results") or []
-        if not results:
-            return None
-        first = results[0]
-        return float(first.get("latitude")), float(first.get("longitude"))
+    """Open-Meteo lookup; None if the name is unknown, raises if the service is unavailable"""
+    url = "https://geocoding-api.open-meteo.com/v1/search"
+    r = await http_clients.request("open-meteo", "GET", url, params={"name": name, "count": 1}, timeout=20)
+    if r.status_code >= 500 or r.status_code == 429:
+        r.raise_for_status()
+    if r.status_code >= 400:
+        return None
+    data = r.json()
+    results = data.get("results") or []
+    if not results:
+        return None
+    first = results[0]
+    return float(first.get("latitude")), float(first.get("longitude"))
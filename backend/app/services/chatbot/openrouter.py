@@ -1,6 +1,6 @@
 from typing import Optional, Dict
-import httpx
 from app.config import settings
+from app.utils.http_client import http_clients
 
 
 async def send_message(message: str, context: Optional[str] = None) -> Dict:
@@ -25,10 +25,9 @@ async def send_message(message: str, context: Optional[str] = None) -> Dict:
     }
 
     url = f"{settings.OPENROUTER_BASE_URL}/chat/completions"
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.post(url, headers=headers, json=payload)
-        if r.status_code >= 400:
-            return {"reply": f"Error {r.status_code}: {r.text[:200]}", "provider": "openrouter", "confidence": 0.0}
-        data = r.json()
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-        return {"reply": content or "", "provider": "openrouter", "confidence": 0.8}
+    r = await http_clients.request("openrouter", "POST", url, headers=headers, json=payload, timeout=30)
+    if r.status_code >= 400:
+        return {"reply": f"Error {r.status_code}: {r.text[:200]}", "provider": "openrouter", "confidence": 0.0}
+    data = r.json()
+    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+    return {"reply": content or "", "provider": "openrouter", "confidence": 0.8}
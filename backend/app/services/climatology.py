@@ -0,0 +1,102 @@
+import calendar
+import json
+import math
+import os
+import threading
+from typing import Dict, Optional
+import numpy as np
+from app.config import settings
+
+# Last axis of the normals array
+VARIABLES = ("temperature", "humidity", "rainfall")
+
+# Forecast features sum a 7-day hourly window of precipitation, so monthly
+# rainfall normals are scaled to one week to stay comparable.
+FORECAST_DAYS = 7
+
+
+def meta_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+class Climatology:
+    """Monthly normals per grid cell, memory-mapped from ``<path>`` (.npy) and ``<path>.json``.
+
+    The array has shape (lat cells, lon cells, 12 months, 3 variables) as
+    float32 with NaN for cells without data; the JSON sidecar holds the
+    grid origin (south-west corner) and cell size in degrees. Only the pages
+    that lookups touch are read from disk.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._normals: Optional[np.ndarray] = None
+        self._meta: Optional[Dict] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.misses = 0
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path and os.path.exists(self.path) and os.path.exists(meta_path(self.path)):
+                with open(meta_path(self.path), encoding="utf-8") as f:
+                    self._meta = json.load(f)
+                self._normals = np.load(self.path, mmap_mode="r")
+            self._loaded = True
+
+    @property
+    def available(self) -> bool:
+        if not self._loaded:
+            self._load()
+        return self._normals is not None
+
+    def lookup(self, lat: float, lon: float, month: int) -> Optional[Dict]:
+        """Weather features for ``month`` (1-12) at the cell containing (lat, lon), or None"""
+        self.lookups += 1
+        if not self.available:
+            self.misses += 1
+            return None
+        meta = self._meta
+        i = math.floor((lat - meta["lat0"]) / meta["step"])
+        j = math.floor((lon - meta["lon0"]) / meta["step"])
+        if not (0 <= i < self._normals.shape[0] and 0 <= j < self._normals.shape[1]):
+            self.misses += 1
+            return None
+        temperature, humidity, rainfall = (float(v) for v in self._normals[i, j, month - 1])
+        if math.isnan(temperature) or math.isnan(humidity) or math.isnan(rainfall):
+            self.misses += 1
+            return None
+        days = calendar.monthrange(2001, month)[1]
+        return {
+            "temperature": round(temperature, 2),
+            "humidity": round(humidity, 2),
+            "rainfall": round(rainfall * FORECAST_DAYS / days, 2),
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "available": self.available,
+            "cells": int(self._normals.shape[0] * self._normals.shape[1]) if self._normals is not None else 0,
+            "lookups": self.lookups,
+            "misses": self.misses,
+        }
+
+
+def write_climatology(path: str, normals: np.ndarray, lat0: float, lon0: float, step: float) -> None:
+    """Atomically write a normals array and its grid metadata"""
+    normals = np.ascontiguousarray(normals, dtype=np.float32)
+    if normals.ndim != 4 or normals.shape[2:] != (12, len(VARIABLES)):
+        raise ValueError(f"expected shape (lat, lon, 12, {len(VARIABLES)}), got {normals.shape}")
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, normals)
+    tmp_meta = f"{meta_path(path)}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump({"lat0": lat0, "lon0": lon0, "step": step, "variables": list(VARIABLES)}, f)
+    os.replace(tmp_path, path)
+    os.replace(tmp_meta, meta_path(path))
+
+
+climatology = Climatology(settings.CLIMATOLOGY_PATH)
@@ -0,0 +1,229 @@
+import csv
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.geocode_cache import GeocodeEntry
+from app.services.area_service import geocode_city
+
+Coords = Tuple[float, float]
+
+# Older or alternative romanizations -> the name Open-Meteo knows best
+CITY_ALIASES = {
+    "bangalore": "Bengaluru",
+    "bombay": "Mumbai",
+    "madras": "Chennai",
+    "calcutta": "Kolkata",
+    "poona": "Pune",
+    "baroda": "Vadodara",
+    "gurgaon": "Gurugram",
+    "allahabad": "Prayagraj",
+    "mysore": "Mysuru",
+    "mangalore": "Mangaluru",
+    "belgaum": "Belagavi",
+    "gulbarga": "Kalaburagi",
+    "hubli": "Hubballi",
+    "bellary": "Ballari",
+    "shimoga": "Shivamogga",
+    "tumkur": "Tumakuru",
+    "trivandrum": "Thiruvananthapuram",
+    "cochin": "Kochi",
+    "calicut": "Kozhikode",
+    "trichur": "Thrissur",
+    "quilon": "Kollam",
+    "pondicherry": "Puducherry",
+    "tanjore": "Thanjavur",
+    "trichy": "Tiruchirappalli",
+    "benares": "Varanasi",
+    "banaras": "Varanasi",
+    "cawnpore": "Kanpur",
+    "simla": "Shimla",
+    "jubbulpore": "Jabalpur",
+    "vizag": "Visakhapatnam",
+    "rajahmundry": "Rajamahendravaram",
+}
+
+_GENERIC_SUFFIXES = {"district", "dist", "city", "town"}
+
+
+def _fold_word(word: str) -> str:
+    # Strip diacritics only where that leaves plain ASCII (Bhōpāl -> bhopal); in
+    # Indic scripts the combining marks are vowel signs and carry the name.
+    stripped = "".join(ch for ch in unicodedata.normalize("NFKD", word) if not unicodedata.combining(ch))
+    return stripped if stripped.isascii() else word
+
+
+def _fold(name: str) -> str:
+    # Letters, marks and digits of any script make up words; everything else separates them
+    text = "".join(
+        ch if unicodedata.category(ch)[0] in "LMN" else " "
+        for ch in unicodedata.normalize("NFKC", name).casefold()
+    )
+    words = [_fold_word(word) for word in text.split()]
+    while len(words) > 1 and words[-1] in _GENERIC_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def _loose(key: str) -> str:
+    # Spelling variants common in romanized Indian names (Poona/Puna, Simmla/Simla).
+    # Only used to match the alias table: applied to every key it would merge
+    # distinct places such as Kota/Kotta or Pali/Palli.
+    text = key.replace("ee", "i").replace("oo", "u")
+    return re.sub(r"([a-z])\1+", r"\1", text)
+
+
+_ALIASES = {_loose(_fold(alias)): canonical for alias, canonical in CITY_ALIASES.items()}
+
+
+def normalize_city_name(name: str) -> Tuple[str, str]:
+    """Returns (cache key, name to send to the geocoder) for a user-entered city"""
+    key = _fold(name)
+    canonical = _ALIASES.get(_loose(key))
+    if canonical:
+        return _fold(canonical), canonical
+    return key, " ".join(unicodedata.normalize("NFKC", name).split())
+
+
+class GeocodeCache:
+    """In-process LRU of geocoding results in front of the ``geocode_cache`` table.
+
+    Entries from the optional seed file are pinned in memory and never
+    expire or leave the process; negative results (unknown names) are kept
+    for ``negative_ttl`` seconds so typos don't hit the geocoder every time.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float, seed_path: Optional[str]):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.seed_path = seed_path
+        self._seed: Optional[Dict[str, Coords]] = None
+        self._entries: "OrderedDict[str, Tuple[Optional[Coords], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.seed_hits = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.lookups = 0
+
+    def seed(self) -> Dict[str, Coords]:
+        if self._seed is None:
+            seed = {}
+            if self.seed_path and os.path.exists(self.seed_path):
+                with open(self.seed_path, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        key, _ = normalize_city_name(row["name"])
+                        seed[key] = (float(row["latitude"]), float(row["longitude"]))
+            self._seed = seed
+        return self._seed
+
+    def get(self, key: str) -> Tuple[bool, Optional[Coords]]:
+        """(found, coords) from the seed or memory; coords None with found True is a cached miss"""
+        seeded = self.seed().get(key)
+        if seeded is not None:
+            self.seed_hits += 1
+            return True, seeded
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] <= now:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return True, entry[0]
+
+    def put(self, key: str, coords: Optional[Coords], ttl: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (coords, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {
+            "seeded": len(self.seed()),
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "seed_hits": self.seed_hits,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+        }
+
+
+geocode_cache = GeocodeCache(
+    max_entries=settings.GEOCODE_CACHE_MAX_ENTRIES,
+    ttl=settings.GEOCODE_CACHE_TTL_SECONDS,
+    negative_ttl=settings.GEOCODE_NEGATIVE_TTL_SECONDS,
+    seed_path=settings.GEOCODE_SEED_PATH,
+)
+
+
+async def lookup_city(db: AsyncSession, name: str) -> Optional[Coords]:
+    """Coordinates for a city via seed -> memory -> geocode_cache table -> Open-Meteo.
+
+    Raises if the geocoder has to be asked and is unavailable; such failures
+    are not cached.
+    """
+    geocode_cache.lookups += 1
+    key, query = normalize_city_name(name)
+    if not key:
+        # Nothing cacheable left (e.g. only punctuation); let the geocoder decide
+        return await geocode_city(query)
+    found, coords = geocode_cache.get(key)
+    if found:
+        return coords
+
+    now = datetime.utcnow()
+    entry = await db.get(GeocodeEntry, key)
+    if entry is not None and (entry.expires_at is None or entry.expires_at > now):
+        geocode_cache.db_hits += 1
+        coords = (entry.latitude, entry.longitude) if entry.latitude is not None else None
+        remaining = (entry.expires_at - now).total_seconds() if entry.expires_at else geocode_cache.ttl
+        geocode_cache.put(key, coords, min(remaining, geocode_cache.ttl))
+        return coords
+
+    coords = await geocode_city(query)
+    ttl = geocode_cache.ttl if coords else geocode_cache.negative_ttl
+    if entry is None:
+        entry = GeocodeEntry(key=key)
+        db.add(entry)
+    entry.query = query
+    entry.latitude, entry.longitude = coords if coords else (None, None)
+    entry.expires_at = now + timedelta(seconds=ttl)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another request cached the same name first
+        await db.rollback()
+    geocode_cache.put(key, coords, ttl)
+    return coords
+
+
+async def export_seed(db: AsyncSession, path: str) -> int:
+    """Write every cached hit to a seed CSV; returns the number of rows"""
+    result = await db.execute(
+        select(GeocodeEntry.query, GeocodeEntry.latitude, GeocodeEntry.longitude)
+        .where(GeocodeEntry.latitude.is_not(None))
+        .order_by(GeocodeEntry.key)
+    )
+    rows = result.all()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "latitude", "longitude"])
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+    return len(rows)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.expense import Expense
+from app.models.yield_model import Yield
+
+# (output field, model column) pairs, in export order
+EXPENSE_EXPORT_FIELDS: Sequence[Tuple[str, object]] = (
+    ("id", Expense.id),
+    ("date", Expense.date),
+    ("category", Expense.category),
+    ("amount", Expense.amount),
+    ("crop", Expense.crop_name),
+    ("description", Expense.note),
+)
+YIELD_EXPORT_FIELDS: Sequence[Tuple[str, object]] = (
+    ("id", Yield.id),
+    ("date", Yield.date),
+    ("crop_name", Yield.crop_name),
+    ("quantity_kg", Yield.quantity_kg),
+    ("price_per_kg", Yield.price_per_kg),
+    ("total_income", Yield.total_income),
+    ("notes", Yield.buyer_notes),
+)
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+async def stream_ledger(model, fields: Sequence[Tuple[str, object]], farm_id: UUID, fmt: str) -> AsyncIterator[str]:
+    """Yield a farm ledger as CSV or NDJSON text chunks, oldest entries first.
+
+    Rows come from a server-side cursor as plain tuples (no ORM objects or
+    Pydantic models), one partition of LEDGER_EXPORT_BATCH_ROWS at a time, so
+    memory stays bounded regardless of ledger size. The export opens its own
+    session because it outlives the request's dependency scope.
+    """
+    names = [name for name, _ in fields]
+    query = (
+        select(*[column for _, column in fields])
+        .where(model.farm_id == farm_id)
+        .order_by(model.date, model.id)
+        .execution_options(yield_per=settings.LEDGER_EXPORT_BATCH_ROWS)
+    )
+    if fmt == "csv":
+        yield _csv_chunk([names])
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            if fmt == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield "".join(json.dumps(dict(zip(names, row)), default=str) + "\n" for row in rows)
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
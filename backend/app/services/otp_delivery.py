@@ -0,0 +1,167 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+from app.config import settings
+from app.utils.http_client import http_clients
+
+
+class OTPSender(ABC):
+    """Delivers one SMS; raises on failure so the queue can retry"""
+
+    @abstractmethod
+    async def send(self, phone: str, message: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class ConsoleSender(OTPSender):
+    """Development sender: prints the message instead of sending it"""
+
+    async def send(self, phone: str, message: str) -> None:
+        print(f"[DEV MODE] SMS to {phone}: {message}")
+
+
+class TwilioSender(OTPSender):
+    """Sends through one shared Twilio client, whose HTTP session pools connections.
+
+    The Twilio SDK is synchronous, so calls run on the default thread pool.
+    """
+
+    def __init__(self, account_sid: str, auth_token: str, from_number: Optional[str]):
+        from twilio.rest import Client
+
+        self.client = Client(account_sid, auth_token)
+        self.from_number = from_number
+
+    async def send(self, phone: str, message: str) -> None:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            None, lambda: self.client.messages.create(body=message, from_=self.from_number, to=phone)
+        )
+        if result.sid is None:
+            raise RuntimeError("Twilio did not return a message SID")
+
+
+class HTTPGatewaySender(OTPSender):
+    """POSTs ``{"to", "message"}`` JSON to an SMS gateway (e.g. scripts/fake_sms_gateway.py)"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, phone: str, message: str) -> None:
+        r = await http_clients.request("sms-gateway", "POST", self.url, json={"to": phone, "message": message}, timeout=self.timeout)
+        r.raise_for_status()
+
+
+def create_sender(kind: str) -> OTPSender:
+    if kind == "auto":
+        kind = "twilio" if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN else "console"
+    if kind == "console":
+        return ConsoleSender()
+    if kind == "twilio":
+        return TwilioSender(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, settings.TWILIO_PHONE_NUMBER)
+    if kind == "http":
+        if not settings.OTP_SMS_GATEWAY_URL:
+            raise ValueError("OTP_SMS_GATEWAY_URL is required for the http OTP sender")
+        return HTTPGatewaySender(settings.OTP_SMS_GATEWAY_URL)
+    raise ValueError(f"Unknown OTP_SENDER: {kind!r}")
+
+
+class OTPDeliveryQueue:
+    """In-process SMS queue drained by ``workers`` tasks.
+
+    ``enqueue`` returns immediately; failed sends are re-queued after an
+    exponential backoff until ``max_attempts`` is reached.
+    """
+
+    def __init__(self, sender_kind: str, workers: int, max_attempts: int, retry_seconds: float, max_queue: int):
+        self.sender_kind = sender_kind
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_seconds = retry_seconds
+        self.max_queue = max_queue
+        self.sender: Optional[OTPSender] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._tasks and self._loop is loop:
+            return
+        self._loop = loop
+        if self.sender is None:
+            self.sender = create_sender(self.sender_kind)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self, drain_seconds: float = 5.0) -> None:
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), drain_seconds)
+            except asyncio.TimeoutError:
+                print(f"OTP delivery stopped with {self._queue.qsize()} messages undelivered")
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        sender, self.sender = self.sender, None
+        if sender is not None:
+            await sender.close()
+
+    def enqueue(self, phone: str, message: str) -> bool:
+        """Queue a message; False if the queue is full"""
+        self.start()
+        try:
+            self._queue.put_nowait((phone, message, 1))
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def metrics(self) -> Dict:
+        return {
+            "sender": type(self.sender).__name__ if self.sender else None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+    def _retry(self, job: Tuple[str, str, int]) -> None:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.failed += 1
+            print(f"Dropping OTP for {job[0]}: delivery queue full")
+
+    async def _run(self) -> None:
+        while True:
+            phone, message, attempt = await self._queue.get()
+            try:
+                await self.sender.send(phone, message)
+                self.sent += 1
+            except Exception as e:
+                if attempt < self.max_attempts:
+                    self.retried += 1
+                    delay = self.retry_seconds * 2 ** (attempt - 1)
+                    self._loop.call_later(delay, self._retry, (phone, message, attempt + 1))
+                else:
+                    self.failed += 1
+                    print(f"Error sending OTP to {phone} after {attempt} attempts: {e}")
+            finally:
+                self._queue.task_done()
+
+
+otp_delivery = OTPDeliveryQueue(
+    sender_kind=settings.OTP_SENDER,
+    workers=settings.OTP_DELIVERY_WORKERS,
+    max_attempts=settings.OTP_DELIVERY_MAX_ATTEMPTS,
+    retry_seconds=settings.OTP_DELIVERY_RETRY_SECONDS,
+    max_queue=settings.OTP_DELIVERY_QUEUE_SIZE,
+)
@@ -0,0 +1,229 @@
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+# Pure rendering: takes plain dicts/lists and returns PDF bytes, so it can run
+# in a worker process. Uses only the standard Type1 Helvetica fonts.
+
+PAGE_WIDTH = 595  # A4 in points
+PAGE_HEIGHT = 842
+MARGIN = 50
+BAR_COLOR = (0.18, 0.55, 0.34)
+INCOME_COLOR = (0.20, 0.45, 0.75)
+
+REPORT_TITLES = {
+    "summary": "Farm Summary",
+    "expenses": "Expense Report",
+    "expenses-graph": "Expense Charts",
+    "profit": "Profit & Loss Report",
+}
+
+
+def render_report(kind: str, data: Dict) -> bytes:
+    """Render one of the REPORT_TITLES report kinds for a farm"""
+    doc = _Document()
+    page = _Page(doc)
+    page.heading(f"{REPORT_TITLES[kind]} - {data['farm']['name']}")
+    page.text(
+        f"{data['farm']['type'] or 'General'} farm, {data['farm']['size']}  |  "
+        f"Generated {data.get('generated_at') or datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}",
+        size=9,
+    )
+    page.gap(10)
+
+    if kind in {"summary", "profit"}:
+        _totals_section(page, data["totals"])
+    if kind == "summary":
+        _category_table(page, data["categories"])
+        _monthly_table(page, data["months"])
+    elif kind == "expenses":
+        _category_table(page, data["categories"])
+        _ledger_table(page, data["ledger"], data.get("ledger_truncated", False))
+    elif kind == "expenses-graph":
+        page.bar_chart("Expenses by category", [(c["category"], c["amount"]) for c in data["categories"]])
+        page.bar_chart("Expenses by month", [(m["month"], m["expenses"]) for m in data["months"][-24:]])
+    elif kind == "profit":
+        page.bar_chart("Income by month", [(m["month"], m["income"]) for m in data["months"][-24:]], color=INCOME_COLOR)
+        _monthly_table(page, data["months"])
+    return doc.build()
+
+
+def _money(value: float) -> str:
+    return f"Rs. {value:,.2f}"
+
+
+def _totals_section(page: "_Page", totals: Dict) -> None:
+    page.subheading("Totals")
+    rows = [
+        ("Total expenses", _money(totals["total_expenses"])),
+        ("Total income", _money(totals["total_income"])),
+        ("Net profit", _money(totals["net_profit"])),
+        ("Profit margin", f"{totals['profit_percentage']:.2f}%"),
+        ("Status", totals["profit_status"]),
+    ]
+    for label, value in rows:
+        page.row([label, value], [200, 200])
+    page.gap(8)
+
+
+def _category_table(page: "_Page", categories: List[Dict]) -> None:
+    page.subheading("Expenses by category")
+    if not categories:
+        page.text("No expenses recorded.", size=9)
+        return
+    page.row(["Category", "Amount"], [300, 150], bold=True)
+    for item in categories:
+        page.row([item["category"], _money(item["amount"])], [300, 150])
+    page.gap(8)
+
+
+def _monthly_table(page: "_Page", months: List[Dict]) -> None:
+    page.subheading("Monthly totals")
+    if not months:
+        page.text("No activity recorded.", size=9)
+        return
+    page.row(["Month", "Expenses", "Income", "Net"], [100, 125, 125, 125], bold=True)
+    for m in months:
+        page.row(
+            [m["month"], _money(m["expenses"]), _money(m["income"]), _money(m["income"] - m["expenses"])],
+            [100, 125, 125, 125],
+        )
+    page.gap(8)
+
+
+def _ledger_table(page: "_Page", ledger: List[Dict], truncated: bool) -> None:
+    page.subheading("Expense ledger")
+    if not ledger:
+        page.text("No expenses recorded.", size=9)
+        return
+    if truncated:
+        page.text(f"Showing the latest {len(ledger)} entries; export the ledger for the full history.", size=8)
+    widths = [70, 100, 95, 230]
+    page.row(["Date", "Category", "Amount", "Note"], widths, bold=True)
+    for e in ledger:
+        page.row([e["date"], e["category"], _money(e["amount"]), e.get("note") or ""], widths)
+
+
+def _escape(text: str) -> str:
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _fit(text: str, width: float, size: float) -> str:
+    # Helvetica averages roughly half an em per character
+    max_chars = max(3, int(width / (size * 0.5)))
+    return text if len(text) <= max_chars else text[: max_chars - 3] + "..."
+
+
+class _Page:
+    """Writing cursor over a document; starts a new page when the current one is full"""
+
+    def __init__(self, doc: "_Document"):
+        self.doc = doc
+        self.ops = doc.new_page()
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _ensure(self, height: float) -> None:
+        if self.y - height < MARGIN:
+            self.ops = self.doc.new_page()
+            self.y = PAGE_HEIGHT - MARGIN
+
+    def _text(self, x: float, y: float, text: str, size: float, bold: bool = False) -> None:
+        font = "F2" if bold else "F1"
+        self.ops.append(f"BT /{font} {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET")
+
+    def heading(self, text: str) -> None:
+        self._ensure(24)
+        self.y -= 18
+        self._text(MARGIN, self.y, _fit(text, PAGE_WIDTH - 2 * MARGIN, 16), 16, bold=True)
+        self.y -= 6
+
+    def subheading(self, text: str) -> None:
+        self._ensure(30)
+        self.y -= 16
+        self._text(MARGIN, self.y, text, 12, bold=True)
+        self.y -= 4
+
+    def text(self, text: str, size: float = 10) -> None:
+        self._ensure(size + 4)
+        self.y -= size + 4
+        self._text(MARGIN, self.y, _fit(text, PAGE_WIDTH - 2 * MARGIN, size), size)
+
+    def gap(self, height: float) -> None:
+        self.y -= height
+
+    def row(self, cells: Sequence[str], widths: Sequence[float], bold: bool = False, size: float = 9) -> None:
+        self._ensure(size + 5)
+        self.y -= size + 5
+        x = MARGIN
+        for cell, width in zip(cells, widths):
+            self._text(x, self.y, _fit(str(cell), width - 6, size), size, bold=bold)
+            x += width
+        if bold:
+            self.ops.append(f"0.6 G 0.5 w {MARGIN} {self.y - 3:.1f} m {MARGIN + sum(widths)} {self.y - 3:.1f} l S")
+
+    def bar_chart(self, title: str, items: List[Tuple[str, float]], color=BAR_COLOR) -> None:
+        self.subheading(title)
+        if not items:
+            self.text("No data.", size=9)
+            return
+        height = 180
+        self._ensure(height + 40)
+        top = self.y - 10
+        bottom = top - height
+        width = PAGE_WIDTH - 2 * MARGIN - 60
+        left = MARGIN + 60
+        peak = max(value for _, value in items) or 1.0
+        slot = width / len(items)
+        bar = max(2.0, slot * 0.7)
+        self.ops.append(f"0.6 G 0.5 w {left} {bottom} m {left + width} {bottom} l S")
+        self.ops.append(f"0.6 G 0.5 w {left} {bottom} m {left} {top} l S")
+        self._text(MARGIN, top - 8, _fit(_money(peak), 58, 7), 7)
+        self._text(MARGIN, bottom, "0", 7)
+        r, g, b = color
+        label_every = max(1, len(items) // 12)
+        for i, (label, value) in enumerate(items):
+            x = left + i * slot + (slot - bar) / 2
+            bar_height = max(0.0, value) / peak * (height - 10)
+            self.ops.append(f"{r} {g} {b} rg {x:.1f} {bottom:.1f} {bar:.1f} {bar_height:.1f} re f")
+            if i % label_every == 0:
+                self._text(x, bottom - 10, _fit(str(label), max(slot * label_every, 24), 6), 6)
+        self.y = bottom - 22
+
+
+class _Document:
+    def __init__(self):
+        self.pages: List[List[str]] = []
+
+    def new_page(self) -> List[str]:
+        ops: List[str] = []
+        self.pages.append(ops)
+        return ops
+
+    def build(self) -> bytes:
+        # Objects: 1 catalog, 2 page tree, 3-4 fonts, then (page, content) per page
+        objects: List[bytes] = []
+        page_ids = [5 + 2 * i for i in range(len(self.pages))]
+        kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+        objects.append(b"<</Type /Catalog /Pages 2 0 R>>")
+        objects.append(f"<</Type /Pages /Kids [{kids}] /Count {len(self.pages)}>>".encode())
+        objects.append(b"<</Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding>>")
+        objects.append(b"<</Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding>>")
+        for pid, ops in zip(page_ids, self.pages):
+            stream = "\n".join(ops).encode("latin-1")
+            objects.append(
+                f"<</Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Contents {pid + 1} 0 R /Resources<</Font<</F1 3 0 R /F2 4 0 R>>>>>>".encode()
+            )
+            objects.append(b"<</Length %d>>stream\n" % len(stream) + stream + b"\nendstream\n")
+
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF" % (len(objects) + 1, xref)
+        return bytes(out)
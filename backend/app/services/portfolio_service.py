@@ -0,0 +1,118 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.expense import Expense
+from app.models.farm import Farm
+from app.models.yield_model import Yield
+from app.models.farm_financials import FarmFinancials, FarmCategoryTotal
+from app.services.rollup_service import as_date
+from app.utils.profit_calculator import summarize_profit
+
+
+async def get_portfolio(db: AsyncSession, user_id: UUID) -> Dict:
+    """Profit, top categories and recent daily trend for every farm a user owns.
+
+    Each metric is one statement grouped by farm, so the number of queries
+    does not grow with the number of farms.
+    """
+    farms = (await db.scalars(
+        select(Farm).where(Farm.user_id == user_id).order_by(Farm.created_at, Farm.id)
+    )).all()
+    if not farms:
+        return {"farms": [], "totals": _summary_fields(Decimal("0"), Decimal("0")), "trend_days": settings.PORTFOLIO_TREND_DAYS}
+    owned = select(Farm.id).where(Farm.user_id == user_id).scalar_subquery()
+
+    totals: Dict[UUID, List[Decimal]] = defaultdict(lambda: [Decimal("0"), Decimal("0")])
+    categories: Dict[UUID, Dict[str, Decimal]] = defaultdict(dict)
+    rows = await db.execute(
+        select(FarmFinancials.farm_id, FarmFinancials.total_expenses, FarmFinancials.total_income)
+        .where(FarmFinancials.farm_id.in_(owned))
+    )
+    for farm_id, expenses, income in rows:
+        totals[farm_id] = [Decimal(str(expenses or 0)), Decimal(str(income or 0))]
+    rows = await db.execute(
+        select(FarmCategoryTotal.farm_id, FarmCategoryTotal.category, FarmCategoryTotal.amount)
+        .where(FarmCategoryTotal.farm_id.in_(owned))
+    )
+    for farm_id, category, amount in rows:
+        categories[farm_id][category] = Decimal(str(amount or 0))
+
+    # Farms without a rollup yet are aggregated from the ledgers, still grouped by farm
+    missing = [farm.id for farm in farms if farm.id not in totals]
+    if missing:
+        rows = await db.execute(
+            select(Expense.farm_id, Expense.category, func.sum(Expense.amount))
+            .where(Expense.farm_id.in_(missing))
+            .group_by(Expense.farm_id, Expense.category)
+        )
+        for farm_id, category, amount in rows:
+            amount = Decimal(str(amount or 0))
+            categories[farm_id][category] = amount
+            totals[farm_id][0] += amount
+        rows = await db.execute(
+            select(Yield.farm_id, func.sum(Yield.total_income))
+            .where(Yield.farm_id.in_(missing))
+            .group_by(Yield.farm_id)
+        )
+        for farm_id, income in rows:
+            totals[farm_id][1] = Decimal(str(income or 0))
+
+    days = settings.PORTFOLIO_TREND_DAYS
+    since = date.today() - timedelta(days=days - 1)
+    trend: Dict[UUID, Dict[date, Dict[str, float]]] = defaultdict(
+        lambda: defaultdict(lambda: {"expenses": 0.0, "income": 0.0})
+    )
+    rows = await db.execute(
+        select(Expense.farm_id, Expense.date, func.sum(Expense.amount))
+        .where(Expense.farm_id.in_(owned), Expense.date >= since)
+        .group_by(Expense.farm_id, Expense.date)
+    )
+    for farm_id, day, amount in rows:
+        trend[farm_id][as_date(day)]["expenses"] = float(amount or 0)
+    rows = await db.execute(
+        select(Yield.farm_id, Yield.date, func.sum(Yield.total_income))
+        .where(Yield.farm_id.in_(owned), Yield.date >= since)
+        .group_by(Yield.farm_id, Yield.date)
+    )
+    for farm_id, day, income in rows:
+        trend[farm_id][as_date(day)]["income"] = float(income or 0)
+
+    window = [since + timedelta(days=i) for i in range(days)]
+    summaries = []
+    for farm in farms:
+        total_expenses, total_income = totals[farm.id]
+        top = sorted(categories[farm.id].items(), key=lambda item: item[1], reverse=True)
+        summaries.append({
+            "farm_id": farm.id,
+            "name": farm.name,
+            **_summary_fields(total_expenses, total_income),
+            "top_categories": [
+                {"category": category or "Uncategorized", "amount": float(amount)}
+                for category, amount in top[: settings.PORTFOLIO_TOP_CATEGORIES]
+            ],
+            "trend": [{"date": day.isoformat(), **trend[farm.id][day]} for day in window],
+        })
+
+    portfolio_expenses = sum((totals[farm.id][0] for farm in farms), Decimal("0"))
+    portfolio_income = sum((totals[farm.id][1] for farm in farms), Decimal("0"))
+    return {
+        "farms": summaries,
+        "totals": _summary_fields(portfolio_expenses, portfolio_income),
+        "trend_days": days,
+    }
+
+
+def _summary_fields(total_expenses: Decimal, total_income: Decimal) -> Dict:
+    profit = summarize_profit(total_expenses, total_income)
+    return {
+        "total_expense": profit["total_expenses"],
+        "total_income": profit["total_income"],
+        "net_profit": profit["net_profit"],
+        "profit_status": profit["profit_status"],
+        "profit_percentage": profit["profit_percentage"],
+    }
@@ -0,0 +1,175 @@
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.farm import Farm
+from app.models.report_job import ReportJob
+from app.services.report_service import build_report, claim_cached_report, report_path
+from app.services.rollup_service import get_farm_data_version
+
+LIVE_STATUSES = ("pending", "running", "done")
+
+
+async def enqueue_report(db: AsyncSession, farm: Farm, user_id: UUID, kind: str) -> ReportJob:
+    """Queue a report render, reusing an existing job for the same farm data if there is one"""
+    version = await get_farm_data_version(db, farm.id)
+    existing = await db.scalar(
+        select(ReportJob)
+        .where(
+            ReportJob.farm_id == farm.id,
+            ReportJob.kind == kind,
+            ReportJob.data_version == version,
+            ReportJob.status.in_(LIVE_STATUSES),
+        )
+        .order_by(ReportJob.created_at.desc())
+        .limit(1)
+    )
+    if existing is not None and (existing.status != "done" or Path(existing.file_path).exists()):
+        return existing
+
+    now = datetime.utcnow()
+    job = ReportJob(user_id=user_id, farm_id=farm.id, kind=kind, data_version=version, available_at=now)
+    cached = report_path(farm.id, kind, version)
+    if claim_cached_report(cached):
+        job.status, job.file_path = "done", str(cached)
+    db.add(job)
+    await db.commit()
+    if job.status == "pending":
+        report_job_queue.notify()
+    return job
+
+
+class ReportJobQueue:
+    """Runs queued report jobs from the ``report_jobs`` table.
+
+    ``workers`` tasks claim jobs with a conditional UPDATE, so several app
+    processes can share one queue. A claimed job holds a lease until
+    ``available_at``; jobs whose worker died are picked up again once it
+    expires. Failures and expired leases both count as attempts; a job is
+    retried with exponential backoff and marked failed after ``max_attempts``.
+    """
+
+    def __init__(self, workers: int, max_attempts: int, retry_seconds: float, lease_seconds: float, poll_seconds: float):
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_seconds = retry_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job_id = await self._claim()
+                if job_id is not None:
+                    await self._process(job_id)
+                    continue
+            except Exception as e:
+                print(f"Report queue error: {e}")
+            # Idle: wait for a new job in this process, or poll for ones queued elsewhere
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> Optional[UUID]:
+        async with AsyncSessionLocal() as db:
+            while True:
+                now = datetime.utcnow()
+                claimable = (
+                    ReportJob.status.in_(("pending", "running")),
+                    ReportJob.available_at <= now,
+                    ReportJob.attempts < self.max_attempts,
+                )
+                # A worker that keeps dying on a job (e.g. OOM while rendering) must not get it forever
+                await db.execute(
+                    update(ReportJob)
+                    .where(
+                        ReportJob.status == "running",
+                        ReportJob.available_at <= now,
+                        ReportJob.attempts >= self.max_attempts,
+                    )
+                    .values(status="failed", error=f"Lease expired after {self.max_attempts} attempts")
+                )
+                job_id = await db.scalar(
+                    select(ReportJob.id)
+                    .where(*claimable)
+                    .order_by(ReportJob.available_at)
+                    .limit(1)
+                )
+                if job_id is None:
+                    await db.commit()
+                    return None
+                # Only one worker wins the row; the others see rowcount 0 and look again
+                result = await db.execute(
+                    update(ReportJob)
+                    .where(ReportJob.id == job_id, *claimable)
+                    .values(
+                        status="running",
+                        attempts=ReportJob.attempts + 1,
+                        available_at=now + timedelta(seconds=self.lease_seconds),
+                    )
+                )
+                await db.commit()
+                if result.rowcount == 1:
+                    return job_id
+
+    async def _process(self, job_id: UUID) -> None:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(ReportJob, job_id)
+            if job is None:
+                return
+            farm = await db.get(Farm, job.farm_id)
+            try:
+                if farm is None:
+                    raise LookupError("Farm no longer exists")
+                path = await build_report(db, farm, job.kind)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await db.rollback()
+                job = await db.get(ReportJob, job_id)
+                job.error = f"{type(e).__name__}: {e}"
+                if farm is None or job.attempts >= self.max_attempts:
+                    job.status = "failed"
+                else:
+                    job.status = "pending"
+                    job.available_at = datetime.utcnow() + timedelta(
+                        seconds=self.retry_seconds * 2 ** (job.attempts - 1)
+                    )
+            else:
+                job.status, job.file_path, job.error = "done", str(path), None
+            await db.commit()
+
+
+report_job_queue = ReportJobQueue(
+    workers=settings.REPORT_JOB_WORKERS,
+    max_attempts=settings.REPORT_JOB_MAX_ATTEMPTS,
+    retry_seconds=settings.REPORT_JOB_RETRY_SECONDS,
+    lease_seconds=settings.REPORT_JOB_LEASE_SECONDS,
+    poll_seconds=settings.REPORT_JOB_POLL_SECONDS,
+)
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.expense import Expense
+from app.models.farm import Farm
+from app.services.pdf_renderer import REPORT_TITLES, render_report
+from app.services.rollup_service import category_totals, monthly_totals, get_farm_data_version
+from app.utils.profit_calculator import calculate_farm_profit
+
+REPORT_KINDS = tuple(REPORT_TITLES)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_inflight: Dict[Path, asyncio.Future] = {}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(1, settings.REPORT_RENDER_WORKERS))
+    return _executor
+
+
+def shutdown_render_pool() -> None:
+    """Stop the render worker processes (recreated on the next render)"""
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def report_path(farm_id: UUID, kind: str, version: str) -> Path:
+    return Path(settings.REPORT_CACHE_DIR) / str(farm_id) / f"{kind}.{version}.pdf"
+
+
+def claim_cached_report(path: Path) -> bool:
+    """Mark a cached PDF as just handed out; False if it no longer exists.
+
+    The sweep in _write_cache only removes superseded versions that nobody
+    has been handed for REPORT_CACHE_GRACE_SECONDS, so a response streaming
+    an older version isn't cut off by a newer render.
+    """
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+async def collect_report_data(db: AsyncSession, farm: Farm, kind: str) -> Dict:
+    """Plain, picklable snapshot of everything the renderer needs for one report"""
+    data = {
+        "farm": {
+            "name": farm.name,
+            "type": farm.farm_type,
+            "size": f"{float(farm.total_area):g} {farm.area_unit}",
+        },
+        "generated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
+        "totals": await calculate_farm_profit(db, farm.id),
+        "categories": [
+            {"category": category or "Uncategorized", "amount": float(amount)}
+            for category, amount in await category_totals(db, farm.id)
+        ],
+        "months": [
+            {"month": month.strftime("%Y-%m"), "expenses": float(expenses), "income": float(income)}
+            for month, expenses, income in await monthly_totals(db, farm.id)
+        ],
+        "ledger": [],
+        "ledger_truncated": False,
+    }
+    if kind == "expenses":
+        limit = settings.REPORT_MAX_LEDGER_ROWS
+        rows = (await db.execute(
+            select(Expense.date, Expense.category, Expense.amount, Expense.note)
+            .where(Expense.farm_id == farm.id)
+            .order_by(Expense.date.desc(), Expense.id.desc())
+            .limit(limit + 1)
+        )).all()
+        data["ledger"] = [
+            {"date": str(row.date), "category": row.category, "amount": float(row.amount), "note": row.note}
+            for row in rows[:limit]
+        ]
+        data["ledger_truncated"] = len(rows) > limit
+    return data
+
+
+async def build_report(db: AsyncSession, farm: Farm, kind: str) -> Path:
+    """Path to an up-to-date PDF for ``kind``, rendering it only if the farm's data changed"""
+    version = await get_farm_data_version(db, farm.id)
+    path = report_path(farm.id, kind, version)
+    if claim_cached_report(path):
+        return path
+
+    pending = _inflight.get(path)
+    if pending is None:
+        data = await collect_report_data(db, farm, kind)
+        # Another request may have started the same render while we were querying
+        pending = _inflight.get(path)
+        if pending is None:
+            pending = asyncio.ensure_future(_render_to_cache(path, kind, data))
+            _inflight[path] = pending
+            pending.add_done_callback(lambda _: _inflight.pop(path, None))
+    # Shielded so a disconnecting client doesn't cancel a render others are waiting on
+    return await asyncio.shield(pending)
+
+
+async def _render_to_cache(path: Path, kind: str, data: Dict) -> Path:
+    loop = asyncio.get_running_loop()
+    try:
+        pdf = await loop.run_in_executor(_get_executor(), render_report, kind, data)
+    except BrokenProcessPool:
+        shutdown_render_pool()
+        raise
+    await loop.run_in_executor(None, _write_cache, path, kind, pdf)
+    return path
+
+
+def _write_cache(path: Path, kind: str, pdf: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(pdf)
+    os.replace(tmp, path)
+    cutoff = time.time() - settings.REPORT_CACHE_GRACE_SECONDS
+    for stale in path.parent.glob(f"{kind}.*.pdf"):
+        try:
+            if stale != path and stale.stat().st_mtime < cutoff:
+                stale.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,287 @@
+import hashlib
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Date, cast, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.expense import Expense
+from app.models.yield_model import Yield
+from app.models.farm_financials import FarmFinancials, FarmCategoryTotal, FarmMonthlyTotal
+
+
+def _dialect_name(db: AsyncSession) -> str:
+    return db.bind.dialect.name
+
+
+def month_start(db: AsyncSession, column):
+    """SQL expression for the first day of the month containing ``column``"""
+    if _dialect_name(db) == "postgresql":
+        return cast(func.date_trunc("month", column), Date)
+    return func.date(column, "start of month")
+
+
+def week_start(db: AsyncSession, column):
+    """SQL expression for the Monday of the week containing ``column``"""
+    if _dialect_name(db) == "postgresql":
+        return cast(func.date_trunc("week", column), Date)
+    return func.date(column, "weekday 0", "-6 days")
+
+
+def _insert(db: AsyncSession, table):
+    if _dialect_name(db) == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def _increment(db: AsyncSession, table, keys: Dict, deltas: Dict, touch: bool = False):
+    """INSERT ... ON CONFLICT DO UPDATE adding ``deltas`` to the existing row"""
+    stmt = _insert(db, table).values(**keys, **deltas)
+    set_ = {name: table.c[name] + stmt.excluded[name] for name in deltas}
+    if touch:
+        set_["updated_at"] = func.now()
+    return stmt.on_conflict_do_update(index_elements=list(keys), set_=set_)
+
+
+async def _ensure_rollup(db: AsyncSession, farm_id: UUID) -> None:
+    """Seed a farm's rollups from its ledgers before the first increment.
+
+    Farms with ledger rows from before the rollup tables existed would
+    otherwise start counting from the first new write. Runs before the new
+    row is flushed, so it is not counted twice; a concurrent writer seeding
+    the same farm loses the ON CONFLICT and just increments.
+    """
+    if await get_farm_financials(db, farm_id) is not None:
+        return
+    farm = (await _live_rollups(db, [farm_id]))[farm_id]
+    await db.execute(_insert(db, FarmFinancials.__table__).values(farm_id=farm_id, **farm["financials"]).on_conflict_do_nothing())
+    if farm["categories"]:
+        await db.execute(_insert(db, FarmCategoryTotal.__table__).values([
+            {"farm_id": farm_id, "category": category, "amount": amount}
+            for category, amount in farm["categories"].items()
+        ]).on_conflict_do_nothing())
+    if farm["months"]:
+        await db.execute(_insert(db, FarmMonthlyTotal.__table__).values([
+            {"farm_id": farm_id, "month": month, **totals}
+            for month, totals in farm["months"].items()
+        ]).on_conflict_do_nothing())
+
+
+async def record_expense(db: AsyncSession, farm_id: UUID, category: str, expense_date: date, amount) -> None:
+    """Fold a new expense into the farm rollups, inside the caller's transaction"""
+    amount = Decimal(str(amount))
+    await _ensure_rollup(db, farm_id)
+    await db.execute(_increment(
+        db, FarmFinancials.__table__, {"farm_id": farm_id},
+        {"total_expenses": amount, "expense_count": 1}, touch=True,
+    ))
+    await db.execute(_increment(
+        db, FarmCategoryTotal.__table__, {"farm_id": farm_id, "category": category},
+        {"amount": amount},
+    ))
+    await db.execute(_increment(
+        db, FarmMonthlyTotal.__table__, {"farm_id": farm_id, "month": expense_date.replace(day=1)},
+        {"expenses": amount},
+    ))
+
+
+async def record_yield(db: AsyncSession, farm_id: UUID, yield_date: date, total_income) -> None:
+    """Fold a new yield sale into the farm rollups, inside the caller's transaction"""
+    total_income = Decimal(str(total_income))
+    await _ensure_rollup(db, farm_id)
+    await db.execute(_increment(
+        db, FarmFinancials.__table__, {"farm_id": farm_id},
+        {"total_income": total_income, "yield_count": 1}, touch=True,
+    ))
+    await db.execute(_increment(
+        db, FarmMonthlyTotal.__table__, {"farm_id": farm_id, "month": yield_date.replace(day=1)},
+        {"income": total_income},
+    ))
+
+
+async def get_farm_financials(db: AsyncSession, farm_id: UUID) -> Optional[FarmFinancials]:
+    """Rollup row for a farm, or None if the farm has never been rolled up"""
+    return await db.get(FarmFinancials, farm_id, populate_existing=True)
+
+
+async def category_totals(db: AsyncSession, farm_id: UUID) -> List[Tuple[str, Decimal]]:
+    """Expense total per category, from the rollup when the farm has one"""
+    if await get_farm_financials(db, farm_id) is not None:
+        query = (
+            select(FarmCategoryTotal.category, FarmCategoryTotal.amount)
+            .where(FarmCategoryTotal.farm_id == farm_id)
+            .order_by(FarmCategoryTotal.category)
+        )
+    else:
+        query = (
+            select(Expense.category, func.sum(Expense.amount))
+            .where(Expense.farm_id == farm_id)
+            .group_by(Expense.category)
+            .order_by(Expense.category)
+        )
+    return [(category, Decimal(str(amount or 0))) for category, amount in await db.execute(query)]
+
+
+async def monthly_totals(db: AsyncSession, farm_id: UUID) -> List[Tuple[date, Decimal, Decimal]]:
+    """(month, expenses, income) per calendar month, from the rollup when the farm has one"""
+    if await get_farm_financials(db, farm_id) is not None:
+        rows = await db.execute(
+            select(FarmMonthlyTotal.month, FarmMonthlyTotal.expenses, FarmMonthlyTotal.income)
+            .where(FarmMonthlyTotal.farm_id == farm_id)
+            .order_by(FarmMonthlyTotal.month)
+        )
+        return [(month, Decimal(str(expenses or 0)), Decimal(str(income or 0))) for month, expenses, income in rows]
+
+    months = (await _live_rollups(db, [farm_id]))[farm_id]["months"]
+    return [(month, totals["expenses"], totals["income"]) for month, totals in sorted(months.items())]
+
+
+async def get_farm_data_version(db: AsyncSession, farm_id: UUID) -> str:
+    """Opaque stamp that changes whenever an expense or yield is written for the farm"""
+    version, _ = await get_farm_data_stamp(db, farm_id)
+    return version
+
+
+async def get_farm_data_stamp(db: AsyncSession, farm_id: UUID) -> Tuple[str, Optional[datetime]]:
+    """(version, last write time) for a farm's ledgers; the time is None before the first write"""
+    rollup = await get_farm_financials(db, farm_id)
+    if rollup is not None:
+        parts = (rollup.expense_count, rollup.yield_count, rollup.total_expenses, rollup.total_income)
+        updated_at = rollup.updated_at
+    else:
+        row = (await db.execute(select(
+            select(func.count()).where(Expense.farm_id == farm_id).scalar_subquery(),
+            select(func.count()).where(Yield.farm_id == farm_id).scalar_subquery(),
+            select(func.sum(Expense.amount)).where(Expense.farm_id == farm_id).scalar_subquery(),
+            select(func.sum(Yield.total_income)).where(Yield.farm_id == farm_id).scalar_subquery(),
+        ))).one()
+        parts = tuple(row)
+        updated_at = None
+    expense_count, yield_count, total_expenses, total_income = parts
+    raw = f"{expense_count}:{yield_count}:{Decimal(str(total_expenses or 0)):.2f}:{Decimal(str(total_income or 0)):.2f}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16], updated_at
+
+
+async def _live_rollups(db: AsyncSession, farm_ids: Optional[Iterable[UUID]] = None) -> Dict:
+    """Recompute every rollup from the ledgers: {farm_id: {"financials", "categories", "months"}}"""
+    farm_ids = list(farm_ids) if farm_ids is not None else None
+
+    def scoped(query, column):
+        return query.where(column.in_(farm_ids)) if farm_ids is not None else query
+
+    rollups: Dict = defaultdict(lambda: {
+        "financials": {"total_expenses": Decimal("0"), "total_income": Decimal("0"), "expense_count": 0, "yield_count": 0},
+        "categories": {},
+        "months": defaultdict(lambda: {"expenses": Decimal("0"), "income": Decimal("0")}),
+    })
+
+    expense_month = month_start(db, Expense.date).label("month")
+    rows = await db.execute(scoped(
+        select(Expense.farm_id, Expense.category, expense_month, func.sum(Expense.amount), func.count())
+        .group_by(Expense.farm_id, Expense.category, expense_month),
+        Expense.farm_id,
+    ))
+    for farm_id, category, month, amount, count in rows:
+        amount = Decimal(str(amount or 0))
+        farm = rollups[farm_id]
+        farm["financials"]["total_expenses"] += amount
+        farm["financials"]["expense_count"] += count
+        farm["categories"][category] = farm["categories"].get(category, Decimal("0")) + amount
+        farm["months"][as_date(month)]["expenses"] += amount
+
+    yield_month = month_start(db, Yield.date).label("month")
+    rows = await db.execute(scoped(
+        select(Yield.farm_id, yield_month, func.sum(Yield.total_income), func.count())
+        .group_by(Yield.farm_id, yield_month),
+        Yield.farm_id,
+    ))
+    for farm_id, month, income, count in rows:
+        income = Decimal(str(income or 0))
+        farm = rollups[farm_id]
+        farm["financials"]["total_income"] += income
+        farm["financials"]["yield_count"] += count
+        farm["months"][as_date(month)]["income"] += income
+
+    return rollups
+
+
+def as_date(value) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+async def rebuild_rollups(db: AsyncSession, farm_ids: Optional[Iterable[UUID]] = None) -> int:
+    """Rebuild rollups from the ledgers (all farms, or only ``farm_ids``); returns farms written"""
+    farm_ids = list(farm_ids) if farm_ids is not None else None
+    for model in (FarmFinancials, FarmCategoryTotal, FarmMonthlyTotal):
+        stmt = delete(model)
+        if farm_ids is not None:
+            stmt = stmt.where(model.farm_id.in_(farm_ids))
+        await db.execute(stmt)
+
+    rollups = await _live_rollups(db, farm_ids)
+    for farm_id, farm in rollups.items():
+        db.add(FarmFinancials(farm_id=farm_id, **farm["financials"]))
+        db.add_all(
+            FarmCategoryTotal(farm_id=farm_id, category=category, amount=amount)
+            for category, amount in farm["categories"].items()
+        )
+        db.add_all(
+            FarmMonthlyTotal(farm_id=farm_id, month=month, **totals)
+            for month, totals in farm["months"].items()
+        )
+    await db.commit()
+    return len(rollups)
+
+
+async def check_rollups(db: AsyncSession, farm_ids: Optional[Iterable[UUID]] = None) -> List[Dict]:
+    """Compare stored rollups with the ledgers and return one entry per mismatch"""
+    farm_ids = list(farm_ids) if farm_ids is not None else None
+    expected = await _live_rollups(db, farm_ids)
+
+    def scoped(model):
+        query = select(model)
+        return query.where(model.farm_id.in_(farm_ids)) if farm_ids is not None else query
+
+    actual: Dict = defaultdict(lambda: {"financials": {}, "categories": {}, "months": {}})
+    for row in (await db.scalars(scoped(FarmFinancials))).all():
+        actual[row.farm_id]["financials"] = {
+            "total_expenses": row.total_expenses,
+            "total_income": row.total_income,
+            "expense_count": row.expense_count,
+            "yield_count": row.yield_count,
+        }
+    for row in (await db.scalars(scoped(FarmCategoryTotal))).all():
+        actual[row.farm_id]["categories"][row.category] = row.amount
+    for row in (await db.scalars(scoped(FarmMonthlyTotal))).all():
+        actual[row.farm_id]["months"][row.month] = {"expenses": row.expenses, "income": row.income}
+
+    mismatches = []
+
+    def compare(farm_id, field, want, have):
+        want = want if want is not None else 0
+        have = have if have is not None else 0
+        if round(Decimal(str(want)), 2) != round(Decimal(str(have)), 2):
+            mismatches.append({"farm_id": str(farm_id), "field": field, "expected": str(want), "actual": str(have)})
+
+    for farm_id in set(expected) | set(actual):
+        want, have = expected.get(farm_id), actual.get(farm_id)
+        want_fin = want["financials"] if want else {}
+        have_fin = have["financials"] if have else {}
+        for field in ("total_expenses", "total_income", "expense_count", "yield_count"):
+            compare(farm_id, field, want_fin.get(field), have_fin.get(field))
+        want_cat = want["categories"] if want else {}
+        have_cat = have["categories"] if have else {}
+        for category in set(want_cat) | set(have_cat):
+            compare(farm_id, f"category:{category}", want_cat.get(category), have_cat.get(category))
+        want_month = want["months"] if want else {}
+        have_month = have["months"] if have else {}
+        for month in set(want_month) | set(have_month):
+            for field in ("expenses", "income"):
+                compare(
+                    farm_id, f"month:{month:%Y-%m}:{field}",
+                    want_month.get(month, {}).get(field), have_month.get(month, {}).get(field),
+                )
+    return mismatches
@@ -1,23 +1,174 @@
-from typing import Dict
+import asyncio
+import functools
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
 import httpx
+import numpy as np
+from app.config import settings
+from app.services.climatology import climatology
+from app.utils.http_client import http_clients
+
+Cell = Tuple[int, int]
+
+EMPTY_WEATHER = {"temperature": 0.0, "humidity": 0.0, "rainfall": 0.0}
+
+
+def grid_cell(lat: float, lon: float, size: float) -> Cell:
+    return math.floor(lat / size), math.floor(lon / size)
+
+
+def cell_center(cell: Cell, size: float) -> Tuple[float, float]:
+    return round((cell[0] + 0.5) * size, 4), round((cell[1] + 0.5) * size, 4)
+
+
+def _series(values) -> np.ndarray:
+    # Open-Meteo reports gaps as null
+    return np.array([np.nan if v is None else v for v in values or ()], dtype=np.float64)
+
+
+def aggregate_hourly(hourly: Dict) -> Dict:
+    """Mean temperature/humidity and total precipitation over the forecast window"""
+    temps = _series(hourly.get("temperature_2m"))
+    hums = _series(hourly.get("relativehumidity_2m"))
+    prec = _series(hourly.get("precipitation"))
+    temp_avg = float(np.nanmean(temps)) if np.isfinite(temps).any() else 0.0
+    hum_avg = float(np.nanmean(hums)) if np.isfinite(hums).any() else 0.0
+    rain_sum = float(np.nansum(prec))
+    return {"temperature": round(temp_avg, 2), "humidity": round(hum_avg, 2), "rainfall": round(rain_sum, 2)}
+
+
+class WeatherCache:
+    """TTL- and size-bounded LRU of aggregated weather features per grid cell.
+
+    Farms in the same ``grid_degrees`` cell share one forecast; concurrent
+    misses for a cell wait on a single in-flight upstream fetch. If the
+    forecast fails or takes longer than ``deadline_seconds``, callers get the
+    local climatology normals for the current month instead (the fetch keeps
+    running and fills the cache for later requests). With ``source`` set to
+    "climatology" the normals are used first and the network only where
+    they have no data.
+    """
+
+    def __init__(self, grid_degrees: float, ttl_seconds: float, max_cells: int, deadline_seconds: float, source: str):
+        self.grid_degrees = grid_degrees
+        self.ttl = ttl_seconds
+        self.max_cells = max_cells
+        self.deadline = deadline_seconds
+        self.source = source
+        self._entries: "OrderedDict[Cell, Tuple[Dict, float]]" = OrderedDict()
+        self._inflight: Dict[Cell, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_errors = 0
+        self.deadline_fallbacks = 0
+        self.climatology_served = 0
+
+    def get(self, cell: Cell) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cell)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(cell)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[cell]
+            return None
+
+    def put(self, cell: Cell, features: Dict) -> None:
+        if self.ttl <= 0 or self.max_cells <= 0:
+            return
+        with self._lock:
+            self._entries[cell] = (features, time.monotonic() + self.ttl)
+            self._entries.move_to_end(cell)
+            while len(self._entries) > self.max_cells:
+                self._entries.popitem(last=False)
+
+    async def features(self, lat: float, lon: float) -> Dict:
+        if self.source == "climatology":
+            normals = self._normals(lat, lon)
+            if normals is not None:
+                return normals
+        cell = grid_cell(lat, lon, self.grid_degrees)
+        cached = self.get(cell)
+        if cached is not None:
+            return dict(cached)
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(cell)
+        if inflight is None or inflight.get_loop() is not loop:
+            self.misses += 1
+            inflight = loop.create_task(self._fetch_cell(cell))
+            self._inflight[cell] = inflight
+            inflight.add_done_callback(functools.partial(self._forget, cell))
+        else:
+            self.coalesced += 1
+        try:
+            # Shielded so a deadline or a cancelled caller doesn't abort the fetch for the others
+            return dict(await asyncio.wait_for(asyncio.shield(inflight), self.deadline))
+        except asyncio.TimeoutError:
+            self.deadline_fallbacks += 1
+        except (httpx.HTTPError, ValueError, KeyError):
+            # Unreachable, or answered with a body that isn't a forecast (bad JSON, missing fields)
+            self.upstream_errors += 1
+        return self._normals(lat, lon) or dict(EMPTY_WEATHER)
+
+    def _normals(self, lat: float, lon: float) -> Optional[Dict]:
+        normals = climatology.lookup(lat, lon, datetime.utcnow().month)
+        if normals is not None:
+            self.climatology_served += 1
+        return normals
+
+    def _forget(self, cell: Cell, task: asyncio.Future) -> None:
+        if self._inflight.get(cell) is task:
+            del self._inflight[cell]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller already gave up on it
+
+    async def _fetch_cell(self, cell: Cell) -> Dict:
+        lat, lon = cell_center(cell, self.grid_degrees)
+        r = await http_clients.request(
+            "open-meteo",
+            "GET",
+            "https://api.open-meteo.com/v1/forecast",
+            params={"latitude": lat, "longitude": lon, "hourly": "temperature_2m,relativehumidity_2m,precipitation"},
+            timeout=20,
+        )
+        r.raise_for_status()
+        payload = r.json()
+        if not isinstance(payload, dict) or not isinstance(payload.get("hourly"), dict):
+            raise KeyError("forecast response has no hourly data")
+        features = aggregate_hourly(payload["hourly"])
+        self.put(cell, features)
+        return features
+
+    def stats(self) -> Dict:
+        return {
+            "grid_degrees": self.grid_degrees,
+            "cells": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "upstream_errors": self.upstream_errors,
+            "deadline_fallbacks": self.deadline_fallbacks,
+            "climatology_served": self.climatology_served,
+            "climatology": climatology.stats(),
+        }
+
+
+weather_cache = WeatherCache(
+    grid_degrees=settings.WEATHER_GRID_DEGREES,
+    ttl_seconds=settings.WEATHER_CACHE_TTL_SECONDS,
+    max_cells=settings.WEATHER_CACHE_MAX_CELLS,
+    deadline_seconds=settings.WEATHER_FORECAST_DEADLINE_SECONDS,
+    source=settings.WEATHER_SOURCE,
+)
 
 
 async def fetch_weather(lat: float, lon: float) -> Dict:
-    url = (
-        "https://api.open-meteo.com/v1/forecast?"
-        f"latitude={lat}&longitude={lon}&hourly=temperature_2m,relativehumidity_2m,precipitation"
-    )
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(url)
-        if r.status_code >= 400:
-            return {"temperature": 0.0, "humidity": 0.0, "rainfall": 0.0}
-        data = r.json()
-        hourly = data.get("hourly", {})
-        temps = hourly.get("temperature_2m") or []
-        hums = hourly.get("relativehumidity_2m") or []
-        prec = hourly.get("precipitation") or []
-        # Simple aggregates
-        temp_avg = sum(temps) / len(temps) if temps else 0.0
-        hum_avg = sum(hums) / len(hums) if hums else 0.0
-        rain_sum = sum(prec) if prec else 0.0
-        return {"temperature": round(temp_avg, 2), "humidity": round(hum_avg, 2), "rainfall": round(rain_sum, 2)}
+    return await weather_cache.features(lat, lon)
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Dict, Optional
+import httpx
+from app.config import settings
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientRegistry:
+    """Shared ``httpx.AsyncClient`` per named upstream, created on first use and closed on shutdown.
+
+    Each client keeps its own keep-alive pool (bounded by ``HTTP_CLIENT_MAX_CONNECTIONS``)
+    and speaks HTTP/2 when ``HTTP_CLIENT_HTTP2`` is set and ``h2`` is installed.
+    Clients are bound to the event loop that created them and are rebuilt if
+    the loop changes.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.http2 = settings.HTTP_CLIENT_HTTP2 and _http2_available()
+        self.retries = 0
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._clients = {}
+            self._loop = loop
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        self.start()
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+            )
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT_SECONDS, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS),
+                # connection pooling, HTTP/2 and connect retries all live on the transport
+                transport=httpx.AsyncHTTPTransport(
+                    http2=self.http2, limits=limits, retries=settings.HTTP_CLIENT_CONNECT_RETRIES
+                ),
+            )
+            self._clients[name] = client
+        return client
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send through the ``name`` client, retrying timeouts and 429/5xx gateway errors with backoff.
+
+        Non-idempotent requests are only retried when they failed to connect
+        (handled by the transport), so a POST is never sent twice.
+        """
+        client = self.get(name)
+        counters = self._counters.setdefault(name, {"requests": 0, "errors": 0, "retries": 0})
+        counters["requests"] += 1
+        method = method.upper()
+        attempts = settings.HTTP_CLIENT_MAX_RETRIES + 1 if method in IDEMPOTENT_METHODS else 1
+        for attempt in range(1, attempts + 1):
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TimeoutException:
+                if attempt == attempts:
+                    counters["errors"] += 1
+                    raise
+            except httpx.HTTPError:
+                counters["errors"] += 1
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == attempts:
+                    if response.status_code >= 500:
+                        counters["errors"] += 1
+                    return response
+                await response.aclose()
+            self.retries += 1
+            counters["retries"] += 1
+            await asyncio.sleep(settings.HTTP_CLIENT_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    def metrics(self) -> Dict:
+        """Pool limits plus per-upstream counters for calls made through :meth:`request`"""
+        return {
+            "clients": sorted(self._clients),
+            "http2": self.http2,
+            "retries": self.retries,
+            "pool": {
+                "max_connections": settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                "max_keepalive_connections": settings.HTTP_CLIENT_MAX_KEEPALIVE,
+                "keepalive_expiry": settings.HTTP_CLIENT_KEEPALIVE_SECONDS,
+            },
+            "upstreams": {name: dict(counters) for name, counters in sorted(self._counters.items())},
+        }
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
+
+
+http_clients = HTTPClientRegistry()
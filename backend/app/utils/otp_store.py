@@ -0,0 +1,181 @@
+import heapq
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+
+class OTPStore(ABC):
+    """Interface for OTP storage backends.
+
+    ``verify`` consumes an attempt and deletes the code on success, expiry or
+    when ``max_attempts`` is exhausted, so a code can be used at most once.
+    Methods may block (file locks), so async callers run them in a thread.
+    """
+
+    @abstractmethod
+    def put(self, phone: str, otp: str, ttl_seconds: float) -> None:
+        ...
+
+    @abstractmethod
+    def verify(self, phone: str, otp: str, max_attempts: int) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, phone: str) -> None:
+        ...
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Drop expired codes; returns how many were removed"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryOTPStore(OTPStore):
+    """Per-process store; expired codes are evicted from a min-heap of expiry times.
+
+    Every ``put`` pops whatever has expired from the top of the heap, so
+    memory stays proportional to the codes issued within one TTL and each
+    code costs O(log n) to expire. Heap entries for codes that were
+    replaced or already used are skipped when they surface.
+    """
+
+    def __init__(self):
+        self._codes: Dict[str, List] = {}  # phone -> [otp, expires_at, attempts]
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def put(self, phone: str, otp: str, ttl_seconds: float) -> None:
+        now = time.monotonic()
+        expires_at = now + ttl_seconds
+        with self._lock:
+            self._sweep(now)
+            self._codes[phone] = [otp, expires_at, 0]
+            heapq.heappush(self._expiry, (expires_at, phone))
+
+    def verify(self, phone: str, otp: str, max_attempts: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._codes.get(phone)
+            if entry is None:
+                return False
+            if now > entry[1] or entry[2] >= max_attempts:
+                del self._codes[phone]
+                return False
+            entry[2] += 1
+            if entry[0] == otp:
+                del self._codes[phone]
+                return True
+            return False
+
+    def delete(self, phone: str) -> None:
+        with self._lock:
+            self._codes.pop(phone, None)
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _sweep(self, now: float) -> int:
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, phone = heapq.heappop(self._expiry)
+            entry = self._codes.get(phone)
+            if entry is not None and entry[1] == expires_at:
+                del self._codes[phone]
+                removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+class SQLiteOTPStore(OTPStore):
+    """File-backed store shared by every worker process on the host.
+
+    Uses WAL mode and one connection per thread; ``verify`` runs inside a
+    ``BEGIN IMMEDIATE`` transaction so two workers can't both accept the
+    same code. Expired rows are deleted through the ``expires_at`` index at
+    most once per ``sweep_interval`` seconds.
+    """
+
+    def __init__(self, path: str, sweep_interval: float = 30.0):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS otp_codes ("
+                "phone TEXT PRIMARY KEY, otp TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_otp_codes_expires_at ON otp_codes (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, phone: str, otp: str, ttl_seconds: float) -> None:
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO otp_codes (phone, otp, expires_at, attempts) VALUES (?, ?, ?, 0) "
+            "ON CONFLICT(phone) DO UPDATE SET otp = excluded.otp, expires_at = excluded.expires_at, attempts = 0",
+            (phone, otp, now + ttl_seconds),
+        )
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.sweep()
+
+    def verify(self, phone: str, otp: str, max_attempts: int) -> bool:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT otp, expires_at, attempts FROM otp_codes WHERE phone = ?", (phone,)
+            ).fetchone()
+            if row is None:
+                accepted = False
+            else:
+                stored, expires_at, attempts = row
+                accepted = stored == otp and time.time() <= expires_at and attempts < max_attempts
+                if accepted or time.time() > expires_at or attempts + 1 >= max_attempts:
+                    conn.execute("DELETE FROM otp_codes WHERE phone = ?", (phone,))
+                else:
+                    conn.execute("UPDATE otp_codes SET attempts = attempts + 1 WHERE phone = ?", (phone,))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return accepted
+
+    def delete(self, phone: str) -> None:
+        self._connection().execute("DELETE FROM otp_codes WHERE phone = ?", (phone,))
+
+    def sweep(self) -> int:
+        return self._connection().execute("DELETE FROM otp_codes WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM otp_codes").fetchone()[0]
+
+
+def create_otp_store(backend: str) -> OTPStore:
+    if backend == "memory":
+        return MemoryOTPStore()
+    if backend == "sqlite":
+        return SQLiteOTPStore(settings.OTP_STORE_SQLITE_PATH, settings.OTP_SWEEP_INTERVAL_SECONDS)
+    raise ValueError(f"Unknown OTP_STORE_BACKEND: {backend!r}")
+
+
+otp_store = create_otp_store(settings.OTP_STORE_BACKEND)
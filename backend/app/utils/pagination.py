@@ -0,0 +1,78 @@
+import base64
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class LedgerPage:
+    limit: int
+    cursor: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    category: Optional[str] = None
+    crop: Optional[str] = None
+
+
+def ledger_page_params(
+    limit: int = Query(settings.LEDGER_PAGE_DEFAULT_LIMIT, ge=1, le=settings.LEDGER_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    category: Optional[str] = Query(None),
+    crop: Optional[str] = Query(None),
+) -> LedgerPage:
+    """Dependency for keyset-paginated ledger listings (newest first)"""
+    return LedgerPage(limit, cursor, date_from, date_to, category, crop)
+
+
+def encode_cursor(row_date: date, row_id: UUID) -> str:
+    raw = f"{row_date.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        row_date, row_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return date.fromisoformat(row_date), UUID(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def fetch_ledger_page(db: AsyncSession, model, query, page: LedgerPage, response: Response) -> List:
+    """Apply filters and a (date, id) keyset to ``query`` and return one page of ``model`` rows.
+
+    The cursor for the following page, if any, is set in the X-Next-Cursor header.
+    """
+    if page.date_from:
+        query = query.where(model.date >= page.date_from)
+    if page.date_to:
+        query = query.where(model.date <= page.date_to)
+    if page.category and hasattr(model, "category"):
+        query = query.where(model.category == page.category)
+    if page.crop:
+        query = query.where(model.crop_name == page.crop)
+    if page.cursor:
+        after_date, after_id = decode_cursor(page.cursor)
+        query = query.where(or_(
+            model.date < after_date,
+            and_(model.date == after_date, model.id < after_id),
+        ))
+    query = query.order_by(model.date.desc(), model.id.desc()).limit(page.limit + 1)
+
+    rows = (await db.scalars(query)).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].date, rows[-1].id)
+    return rows
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+from uuid import UUID
+from app.config import settings
+
+
+class PrincipalCache:
+    """TTL- and size-bounded LRU of user ids recently confirmed as active.
+
+    A hit lets an authenticated request skip the users-table lookup; entries
+    expire after ``ttl_seconds`` so a deactivation made by another worker is
+    picked up within that window.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[UUID, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_active(self, user_id: UUID) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            expires_at = self._entries.get(user_id)
+            if expires_at is not None and expires_at > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return True
+            if expires_at is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return False
+
+    def mark_active(self, user_id: UUID) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = time.monotonic() + self.ttl
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
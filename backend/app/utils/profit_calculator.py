@@ -1,30 +1,51 @@
+from collections import defaultdict
+from datetime import date
 from decimal import Decimal
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Tuple, Union
 from uuid import UUID
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from app.config import settings
 from app.models.expense import Expense
 from app.models.yield_model import Yield
+from app.services.rollup_service import as_date, get_farm_financials, month_start, monthly_totals, week_start
+from app.utils.time_buckets import bucket_label, bucket_start, count_buckets, iter_buckets
 
 
-def calculate_farm_profit(db: Session, farm_id: Union[str, UUID]) -> Dict:
+async def calculate_farm_profit(db: AsyncSession, farm_id: Union[str, UUID]) -> Dict:
     """Calculate profit/loss for a farm"""
     # Convert to UUID if string
     if isinstance(farm_id, str):
         farm_id = UUID(farm_id)
     
-    # Calculate total expenses
-    total_expenses_result = db.query(func.sum(Expense.amount)).filter(
-        Expense.farm_id == farm_id
-    ).scalar()
-    total_expenses = Decimal(str(total_expenses_result)) if total_expenses_result else Decimal("0")
-    
-    # Calculate total income
-    total_income_result = db.query(func.sum(Yield.total_income)).filter(
-        Yield.farm_id == farm_id
-    ).scalar()
-    total_income = Decimal(str(total_income_result)) if total_income_result else Decimal("0")
-    
+    # O(1) read from the rollup; farms not yet backfilled fall back to the ledgers
+    rollup = await get_farm_financials(db, farm_id)
+    if rollup is not None:
+        total_expenses = Decimal(str(rollup.total_expenses or 0))
+        total_income = Decimal(str(rollup.total_income or 0))
+    else:
+        total_expenses, total_income = await get_farm_totals(db, farm_id)
+    return summarize_profit(total_expenses, total_income)
+
+
+async def get_farm_totals(db: AsyncSession, farm_id: UUID) -> Tuple[Decimal, Decimal]:
+    """Total expenses and income for a farm in a single round trip"""
+    total_expenses = (
+        select(func.coalesce(func.sum(Expense.amount), 0))
+        .where(Expense.farm_id == farm_id)
+        .scalar_subquery()
+    )
+    total_income = (
+        select(func.coalesce(func.sum(Yield.total_income), 0))
+        .where(Yield.farm_id == farm_id)
+        .scalar_subquery()
+    )
+    row = (await db.execute(select(total_expenses, total_income))).one()
+    return Decimal(str(row[0] or 0)), Decimal(str(row[1] or 0))
+
+
+def summarize_profit(total_expenses: Decimal, total_income: Decimal) -> Dict:
+    """Derive net profit, status and percentage from expense and income totals"""
     # Calculate net profit
     net_profit = total_income - total_expenses
     
@@ -47,29 +68,68 @@ def calculate_farm_profit(db: Session, farm_id: Union[str, UUID]) -> Dict:
     }
 
 
-def get_expense_trends(db: Session, farm_id: Union[str, UUID], from_date: str = None, to_date: str = None) -> List[Dict]:
-    """Get expense trends grouped by date"""
+async def get_expense_trends(
+    db: AsyncSession,
+    farm_id: Union[str, UUID],
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    bucket: str = "day",
+    fill: bool = False,
+    cumulative: bool = False,
+) -> List[Dict]:
+    """Get expense totals per day/week/month/season bucket, oldest first.
+
+    Raises ValueError if ``from_date`` is after ``to_date`` or if filling
+    would produce more than TREND_MAX_BUCKETS points.
+    """
     # Convert to UUID if string
     if isinstance(farm_id, str):
         farm_id = UUID(farm_id)
-    
-    query = db.query(
-        Expense.date,
-        func.sum(Expense.amount).label("total")
-    ).filter(Expense.farm_id == farm_id)
-    
-    if from_date:
-        query = query.filter(Expense.date >= from_date)
-    if to_date:
-        query = query.filter(Expense.date <= to_date)
-    
-    results = query.group_by(Expense.date).order_by(Expense.date).all()
-    
-    return [
-        {
-            "date": str(result.date),
-            "total": float(result.total)
-        }
-        for result in results
-    ]
+    if from_date and to_date and from_date > to_date:
+        raise ValueError("'from' must not be after 'to'")
+
+    # Seasons are whole months, so they are folded from monthly sums
+    sql_bucket = "month" if bucket == "season" else bucket
+    if sql_bucket == "month" and from_date is None and to_date is None:
+        rows = [(month, expenses) for month, expenses, _ in await monthly_totals(db, farm_id)]
+    else:
+        if sql_bucket == "day":
+            start = Expense.date
+        elif sql_bucket == "week":
+            start = week_start(db, Expense.date)
+        else:
+            start = month_start(db, Expense.date)
+        start = start.label("bucket")
+        query = select(start, func.sum(Expense.amount)).where(Expense.farm_id == farm_id)
+        if from_date:
+            query = query.where(Expense.date >= from_date)
+        if to_date:
+            query = query.where(Expense.date <= to_date)
+        rows = (await db.execute(query.group_by(start).order_by(start))).all()
+
+    totals: Dict[date, Decimal] = defaultdict(Decimal)
+    for start, amount in rows:
+        if amount:
+            totals[bucket_start(bucket, as_date(start))] += Decimal(str(amount))
+
+    if fill and (totals or (from_date and to_date)):
+        first = from_date or min(totals)
+        last = to_date or max(totals)
+        if count_buckets(bucket, first, last) > settings.TREND_MAX_BUCKETS:
+            raise ValueError(
+                f"Range has more than {settings.TREND_MAX_BUCKETS} {bucket} buckets; narrow 'from'/'to' or use a coarser bucket"
+            )
+        starts = list(iter_buckets(bucket, first, last))
+    else:
+        starts = sorted(totals)
 
+    points = []
+    running = Decimal("0")
+    for start in starts:
+        total = totals.get(start, Decimal("0"))
+        running += total
+        point = {"date": start.isoformat(), "label": bucket_label(bucket, start), "total": float(total)}
+        if cumulative:
+            point["cumulative"] = float(running)
+        points.append(point)
+    return points
@@ -0,0 +1,182 @@
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+
+
+# (key, limit, window seconds)
+Check = Tuple[str, int, float]
+
+
+class RateLimitStore(ABC):
+    """Sliding-window hit counter.
+
+    ``hit`` applies several checks atomically: it records one hit for every
+    key only if all of them are under their limit, and otherwise records
+    nothing and returns the seconds until every check would pass (0 means
+    allowed). It may block on a file lock, so async callers run it in a thread.
+    """
+
+    @abstractmethod
+    def hit(self, checks: Sequence[Check]) -> float:
+        ...
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process store: one ring buffer of the last ``limit`` hit times per key.
+
+    A hit is allowed when the oldest slot in the ring is outside the window,
+    and then overwrites it, so each key costs O(limit) floats. Keys live in
+    an LRU bounded by ``max_keys``, so idle clients are evicted first.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._rings: "OrderedDict[str, List]" = OrderedDict()  # key -> [times, next slot]
+        self._lock = threading.Lock()
+
+    def _ring(self, key: str, limit: int) -> List:
+        ring = self._rings.get(key)
+        if ring is None or len(ring[0]) != limit:
+            ring = [[-math.inf] * limit, 0]
+            self._rings[key] = ring
+            while len(self._rings) > self.max_keys:
+                self._rings.popitem(last=False)
+        self._rings.move_to_end(key)
+        return ring
+
+    def hit(self, checks: Sequence[Check]) -> float:
+        now = time.monotonic()
+        with self._lock:
+            rings = [(self._ring(key, limit), window) for key, limit, window in checks]
+            retry_after = 0.0
+            for (times, slot), window in rings:
+                oldest = times[slot]
+                if now - oldest < window:
+                    retry_after = max(retry_after, oldest + window - now)
+            if retry_after > 0:
+                return retry_after
+            for ring, _ in rings:
+                times, slot = ring
+                times[slot] = now
+                ring[1] = (slot + 1) % len(times)
+            return 0.0
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Hit log in a SQLite file shared by every worker process on the host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._next_cleanup = 0.0
+        self._max_window = 0.0
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_hits (key TEXT NOT NULL, at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limit_hits_key_at ON rate_limit_hits (key, at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, checks: Sequence[Check]) -> float:
+        now = time.time()
+        self._max_window = max([self._max_window, *(window for _, _, window in checks)])
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            retry_after = 0.0
+            for key, limit, window in checks:
+                count, oldest = conn.execute(
+                    "SELECT COUNT(*), MIN(at) FROM (SELECT at FROM rate_limit_hits WHERE key = ? AND at > ? ORDER BY at DESC LIMIT ?)",
+                    (key, now - window, limit),
+                ).fetchone()
+                if count >= limit:
+                    retry_after = max(retry_after, oldest + window - now)
+            if retry_after <= 0:
+                conn.executemany(
+                    "INSERT INTO rate_limit_hits (key, at) VALUES (?, ?)",
+                    [(key, now) for key, _, _ in checks],
+                )
+            if now >= self._next_cleanup:
+                self._next_cleanup = now + 60
+                conn.execute("DELETE FROM rate_limit_hits WHERE at <= ?", (now - self._max_window,))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return retry_after
+
+
+def create_rate_limit_store(backend: str) -> RateLimitStore:
+    if backend == "memory":
+        return MemoryRateLimitStore(settings.RATE_LIMIT_MAX_KEYS)
+    if backend == "sqlite":
+        return SQLiteRateLimitStore(settings.RATE_LIMIT_SQLITE_PATH)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
+
+
+rate_limit_store = create_rate_limit_store(settings.RATE_LIMIT_BACKEND)
+
+
+def parse_rule(rule: str) -> Tuple[str, int, float]:
+    """``"phone:3/600"`` -> ("phone", 3, 600.0): at most 3 hits per phone in 600 seconds"""
+    scope, _, spec = rule.partition(":")
+    limit, _, seconds = spec.partition("/")
+    return scope.strip(), int(limit), float(seconds)
+
+
+def _client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(route: str) -> Callable:
+    """Dependency enforcing ``settings.RATE_LIMITS[route]`` per client IP and/or request phone"""
+    rules = [parse_rule(rule) for rule in settings.RATE_LIMITS.get(route, [])]
+
+    async def dependency(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        checks = []
+        for scope, limit, window in rules:
+            if scope == "ip":
+                subject = _client_ip(request)
+            elif scope == "phone":
+                # FastAPI has already parsed the body for the endpoint, so this is cached
+                try:
+                    body = await request.json()
+                except ValueError:
+                    continue
+                subject = body.get("phone") if isinstance(body, dict) else None
+                if not subject:
+                    continue
+            else:
+                continue
+            checks.append((f"{route}:{scope}:{subject}", limit, window))
+        if not checks:
+            return
+        # All rules in one call, so a request rejected by one rule doesn't use up the others
+        retry_after = await run_in_threadpool(rate_limit_store.hit, checks)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
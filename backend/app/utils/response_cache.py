@@ -0,0 +1,123 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from uuid import UUID
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+
+
+class ResponseCache:
+    """Size-bounded LRU of serialized JSON bodies keyed by user, URL and data version.
+
+    Entries never go stale: a write changes the data version, so the next
+    request misses and the old entry ages out of the LRU.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple, body: bytes) -> None:
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    # Only the ETag is validated: it carries the data version, while
+    # Last-Modified has one-second resolution and would 304 a write made in
+    # the same second as the cached response. If-Modified-Since is ignored.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+async def cached_json(
+    request: Request,
+    user_id: UUID,
+    stamp: Tuple[str, Optional[datetime]],
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """Serve ``build()`` as JSON with ETag/Last-Modified, a 304 or a cached body when possible.
+
+    ``stamp`` is the (version, last modified) of the data behind the
+    response; ``build`` only runs when neither the client nor the cache has
+    the body for that version.
+    """
+    version, last_modified = stamp
+    url = request.url.path + ("?" + request.url.query if request.url.query else "")
+    etag = '"' + hashlib.sha1(f"{url}|{version}".encode()).hexdigest()[:24] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+
+    if _not_modified(request, etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    key = (user_id, url, version)
+    body = response_cache.get(key)
+    if body is None:
+        content = jsonable_encoder(await build())
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        response_cache.put(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
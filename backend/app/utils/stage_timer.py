@@ -0,0 +1,48 @@
+import time
+from typing import Awaitable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """Wall-clock milliseconds per named stage of one request, rendered as a Server-Timing header"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.durations[name] = (time.perf_counter() - start) * 1000
+
+    def total(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def header(self) -> str:
+        parts = [f"{name};dur={ms:.1f}" for name, ms in self.durations.items()]
+        parts.append(f"total;dur={self.total():.1f}")
+        return ", ".join(parts)
+
+
+class StageStats:
+    """Running count, mean and max per stage across requests"""
+
+    def __init__(self):
+        self._stages: Dict[str, list] = {}  # name -> [count, total_ms, max_ms]
+
+    def record(self, timer: StageTimer) -> None:
+        durations = dict(timer.durations, total=timer.total())
+        for name, ms in durations.items():
+            entry = self._stages.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += ms
+            entry[2] = max(entry[2], ms)
+
+    def metrics(self) -> Dict:
+        return {
+            name: {"count": count, "avg_ms": round(total / count, 2), "max_ms": round(peak, 2)}
+            for name, (count, total, peak) in self._stages.items()
+        }
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from typing import Iterator
+
+BUCKETS = ("day", "week", "month", "season")
+
+# Indian cropping seasons by starting month; Rabi runs Nov-Mar across the year boundary
+SEASON_STARTS = {4: "Zaid", 6: "Kharif", 11: "Rabi"}
+
+
+def season_start(d: date) -> date:
+    """First day of the Kharif (Jun-Oct), Rabi (Nov-Mar) or Zaid (Apr-May) season containing ``d``"""
+    if 6 <= d.month <= 10:
+        return date(d.year, 6, 1)
+    if d.month >= 11:
+        return date(d.year, 11, 1)
+    if d.month <= 3:
+        return date(d.year - 1, 11, 1)
+    return date(d.year, 4, 1)
+
+
+def bucket_start(bucket: str, d: date) -> date:
+    if bucket == "day":
+        return d
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())
+    if bucket == "month":
+        return d.replace(day=1)
+    return season_start(d)
+
+
+def next_bucket(bucket: str, start: date) -> date:
+    if bucket == "day":
+        return start + timedelta(days=1)
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    if start.month == 4:
+        return date(start.year, 6, 1)
+    if start.month == 6:
+        return date(start.year, 11, 1)
+    return date(start.year + 1, 4, 1)
+
+
+def _bucket_index(bucket: str, start: date) -> int:
+    if bucket == "day":
+        return start.toordinal()
+    if bucket == "week":
+        return start.toordinal() // 7
+    if bucket == "month":
+        return start.year * 12 + start.month - 1
+    return start.year * 3 + {4: 0, 6: 1, 11: 2}[start.month]
+
+
+def count_buckets(bucket: str, first: date, last: date) -> int:
+    """Number of buckets iter_buckets(bucket, first, last) yields, without iterating"""
+    if first > last:
+        return 0
+    return _bucket_index(bucket, bucket_start(bucket, last)) - _bucket_index(bucket, bucket_start(bucket, first)) + 1
+
+
+def iter_buckets(bucket: str, first: date, last: date) -> Iterator[date]:
+    """Every bucket start from the bucket holding ``first`` through the one holding ``last``"""
+    current, last = bucket_start(bucket, first), bucket_start(bucket, last)
+    while current <= last:
+        yield current
+        try:
+            current = next_bucket(bucket, current)
+        except (OverflowError, ValueError):
+            return  # the bucket holding date.max
+
+
+def bucket_label(bucket: str, start: date) -> str:
+    if bucket == "day":
+        return start.isoformat()
+    if bucket == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if bucket == "month":
+        return start.strftime("%Y-%m")
+    name = SEASON_STARTS[start.month]
+    return f"{name} {start.year}-{(start.year + 1) % 100:02d}" if name == "Rabi" else f"{name} {start.year}"
@@ -0,0 +1,150 @@
+"""
+Concurrent request throughput benchmark for the farm read endpoints.
+
+Seeds one active user with a few farms and a synthetic expense/yield history,
+then fires GET requests at the API with a fixed number of concurrent clients
+and reports throughput and latency percentiles.
+
+Usage:
+    # In-process against a throwaway SQLite database (ASGI transport)
+    python scripts/bench_api_concurrency.py --concurrency 50 --requests 2000
+
+    # Against a running server that uses the same DATABASE_URL / JWT secret
+    uvicorn app.main:app --workers 1 &
+    python scripts/bench_api_concurrency.py --base-url http://localhost:8000
+
+To compare before/after a change, start the server from each revision and run
+the --base-url form against both with identical arguments.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--farms", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=2000, help="Expense rows per farm (yields get a quarter)")
+    return parser.parse_args()
+
+
+def seed(farms: int, rows: int):
+    from app.database import SessionLocal, engine, Base
+    from app.models import User, Farm, Expense, Yield
+    from app.utils.jwt_handler import create_access_token
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        user = User(name="Bench", phone=f"+99{rng.randrange(10**9)}", is_active=True)
+        db.add(user)
+        db.flush()
+        farm_ids = []
+        start = date.today() - timedelta(days=3 * 365)
+        for i in range(farms):
+            farm = Farm(user_id=user.id, name=f"Bench farm {i}", farm_type="wheat", total_area=10, area_unit="acre")
+            db.add(farm)
+            db.flush()
+            farm_ids.append(farm.id)
+            db.add_all(
+                Expense(
+                    farm_id=farm.id,
+                    crop_name="wheat",
+                    date=start + timedelta(days=rng.randrange(3 * 365)),
+                    category=rng.choice(["seeds", "fertilizer", "labor", "fuel", "misc"]),
+                    amount=round(rng.uniform(50, 5000), 2),
+                )
+                for _ in range(rows)
+            )
+            db.add_all(
+                Yield(
+                    farm_id=farm.id,
+                    crop_name="wheat",
+                    date=start + timedelta(days=rng.randrange(3 * 365)),
+                    quantity_kg=100,
+                    price_per_kg=20,
+                    total_income=2000,
+                )
+                for _ in range(rows // 4)
+            )
+        db.commit()
+        token = create_access_token({"sub": str(user.id), "phone": user.phone}, expires_delta=timedelta(hours=1))
+        return token, farm_ids
+    finally:
+        db.close()
+
+
+def endpoints(farm_ids):
+    paths = ["/farms"]
+    for farm_id in farm_ids:
+        paths += [
+            f"/farms/{farm_id}",
+            f"/farms/{farm_id}/expenses/by-category",
+            f"/farms/{farm_id}/expenses/trend",
+            f"/reports/farm/{farm_id}",
+            f"/dashboard/farm-summary?farmId={farm_id}",
+        ]
+    return paths
+
+
+async def run(client, paths, total: int, concurrency: int):
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            r = await client.get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - started)
+            if r.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+async def main():
+    args = parse_args()
+    if not args.base_url:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    import httpx
+
+    token, farm_ids = seed(args.farms, args.rows)
+    headers = {"Authorization": f"Bearer {token}"}
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=60)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers)
+
+    async with client:
+        await run(client, endpoints(farm_ids), min(args.requests, 50), 1)  # warm up
+        elapsed, latencies, errors = await run(client, endpoints(farm_ids), args.requests, args.concurrency)
+
+    latencies.sort()
+    print(f"requests:    {len(latencies)} ({errors} errors)")
+    print(f"concurrency: {args.concurrency}")
+    print(f"throughput:  {len(latencies) / elapsed:.1f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"latency max: {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""
+Query plan and timing benchmark for the expense/yield farm indexes.
+
+Seeds a synthetic ledger (many farms, large per-farm history) into a
+throwaway SQLite database, then runs the farm-scoped queries the API issues
+twice: once with the composite indexes dropped and once with them in place,
+printing the query plan and the median time of each.
+
+Usage:
+    python scripts/bench_ledger_indexes.py --farms 200 --expenses 500 --yields 100
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from app.database import Base
+from app.models import User, Farm, Expense, Yield
+
+CATEGORIES = ["seeds", "fertilizer", "labor", "fuel", "irrigation", "misc"]
+
+
+def seed(engine, farms: int, expenses: int, yields: int):
+    rng = random.Random(7)
+    start = date.today() - timedelta(days=5 * 365)
+    user_id = uuid.uuid4()
+    farm_ids = [uuid.uuid4() for _ in range(farms)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": user_id, "name": "Bench", "phone": "+990000000", "is_active": True}])
+        conn.execute(
+            Farm.__table__.insert(),
+            [{"id": f, "user_id": user_id, "name": f"Farm {i}", "total_area": 10, "area_unit": "acre"} for i, f in enumerate(farm_ids)],
+        )
+        for farm_id in farm_ids:
+            conn.execute(Expense.__table__.insert(), [
+                {
+                    "id": uuid.uuid4(),
+                    "farm_id": farm_id,
+                    "crop_name": "wheat",
+                    "date": start + timedelta(days=rng.randrange(5 * 365)),
+                    "category": rng.choice(CATEGORIES),
+                    "amount": round(rng.uniform(10, 5000), 2),
+                }
+                for _ in range(expenses)
+            ])
+            conn.execute(Yield.__table__.insert(), [
+                {
+                    "id": uuid.uuid4(),
+                    "farm_id": farm_id,
+                    "crop_name": "wheat",
+                    "date": start + timedelta(days=rng.randrange(5 * 365)),
+                    "quantity_kg": 100,
+                    "price_per_kg": 20,
+                    "total_income": round(rng.uniform(500, 50000), 2),
+                }
+                for _ in range(yields)
+            ])
+    return farm_ids
+
+
+def queries(farm_id):
+    return {
+        "list expenses": select(Expense).where(Expense.farm_id == farm_id).order_by(Expense.date.desc()),
+        "list yields": select(Yield).where(Yield.farm_id == farm_id).order_by(Yield.date.desc()),
+        "expenses by category": select(Expense.category, func.sum(Expense.amount))
+            .where(Expense.farm_id == farm_id).group_by(Expense.category),
+        "expense trend": select(Expense.date, func.sum(Expense.amount))
+            .where(Expense.farm_id == farm_id).group_by(Expense.date).order_by(Expense.date),
+        "profit totals": select(
+            select(func.sum(Expense.amount)).where(Expense.farm_id == farm_id).scalar_subquery(),
+            select(func.sum(Yield.total_income)).where(Yield.farm_id == farm_id).scalar_subquery(),
+        ),
+    }
+
+
+def measure(engine, farm_ids, repeat: int):
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in queries(farm_ids[0]).items():
+            compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+            timings = []
+            for i in range(repeat):
+                stmt = queries(farm_ids[i % len(farm_ids)])[name]
+                started = time.perf_counter()
+                conn.execute(stmt).fetchall()
+                timings.append(time.perf_counter() - started)
+            results[name] = (" | ".join(row[-1] for row in plan), statistics.median(timings))
+    return results
+
+
+def indexes():
+    return [index for table in (Expense.__table__, Yield.__table__) for index in table.indexes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark farm-scoped ledger queries with and without indexes")
+    parser.add_argument("--farms", type=int, default=200)
+    parser.add_argument("--expenses", type=int, default=500, help="Expense rows per farm")
+    parser.add_argument("--yields", type=int, default=100, help="Yield rows per farm")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{tempfile.mkdtemp()}/ledger_bench.db")
+    Base.metadata.create_all(bind=engine)
+    print(f"Seeding {args.farms} farms x ({args.expenses} expenses + {args.yields} yields)...")
+    farm_ids = seed(engine, args.farms, args.expenses, args.yields)
+
+    with engine.begin() as conn:
+        for index in indexes():
+            conn.execute(DropIndex(index))
+        conn.execute(text("ANALYZE"))
+    before = measure(engine, farm_ids, args.repeat)
+
+    with engine.begin() as conn:
+        for index in indexes():
+            conn.execute(CreateIndex(index))
+        conn.execute(text("ANALYZE"))
+    after = measure(engine, farm_ids, args.repeat)
+
+    for name in before:
+        plan_before, t_before = before[name]
+        plan_after, t_after = after[name]
+        print(f"\n{name}")
+        print(f"  before: {t_before * 1000:8.2f} ms  {plan_before}")
+        print(f"  after:  {t_after * 1000:8.2f} ms  {plan_after}")
+        if t_after:
+            print(f"  speedup: {t_before / t_after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
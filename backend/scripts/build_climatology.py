@@ -0,0 +1,74 @@
+"""
+Build the memory-mapped climatology table (CLIMATOLOGY_PATH) used when
+weather forecasts are slow or unavailable.
+
+Input is a CSV of monthly normals, one row per station or grid point and
+month, e.g. exported from IMD, ERA5 or WorldClim:
+
+    lat,lon,month,temperature,humidity,rainfall
+    18.52,73.85,1,21.3,48.0,1.2
+
+temperature is the mean in °C, humidity the mean relative humidity in %,
+rainfall the monthly total in mm. Points are averaged into square cells of
+--step degrees; cells without data are stored as NaN.
+
+Usage:
+    python scripts/build_climatology.py normals.csv [--step 0.25] [--out climatology.npy]
+"""
+import argparse
+import csv
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.climatology import VARIABLES, write_climatology
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Grid monthly climate normals into a memory-mappable .npy file")
+    parser.add_argument("csv_path")
+    parser.add_argument("--step", type=float, default=0.25, help="Cell size in degrees")
+    parser.add_argument("--out", default=settings.CLIMATOLOGY_PATH)
+    args = parser.parse_args()
+
+    with open(args.csv_path, newline="", encoding="utf-8") as f:
+        rows = [
+            (float(r["lat"]), float(r["lon"]), int(r["month"]), *(float(r[v]) for v in VARIABLES))
+            for r in csv.DictReader(f)
+        ]
+    if not rows:
+        print("❌ No rows in input")
+        return 1
+    data = np.array(rows, dtype=np.float64)
+    lats, lons, months, values = data[:, 0], data[:, 1], data[:, 2].astype(int), data[:, 3:]
+    if months.min() < 1 or months.max() > 12:
+        print("❌ month must be between 1 and 12")
+        return 1
+
+    lat0 = math.floor(lats.min() / args.step) * args.step
+    lon0 = math.floor(lons.min() / args.step) * args.step
+    i = np.floor((lats - lat0) / args.step).astype(int)
+    j = np.floor((lons - lon0) / args.step).astype(int)
+    shape = (i.max() + 1, j.max() + 1, 12, len(VARIABLES))
+
+    sums = np.zeros(shape)
+    counts = np.zeros(shape[:3])
+    np.add.at(sums, (i, j, months - 1), values)
+    np.add.at(counts, (i, j, months - 1), 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normals = sums / counts[..., None]
+    normals[counts == 0] = np.nan
+
+    write_climatology(args.out, normals, round(lat0, 6), round(lon0, 6), args.step)
+    filled = int((counts > 0).all(axis=2).sum())
+    print(f"✅ Wrote {shape[0]}x{shape[1]} cells ({filled} with all 12 months) to {args.out}, {os.path.getsize(args.out) / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Local fake SMS gateway for OTP load tests.
+
+Accepts the JSON that the ``http`` OTP sender posts ({"to", "message"}),
+optionally adds latency and random failures, and prints a running count of
+delivered messages. Point the API at it with:
+
+    OTP_SENDER=http OTP_SMS_GATEWAY_URL=http://127.0.0.1:9911/sms uvicorn app.main:app
+
+Usage:
+    python scripts/fake_sms_gateway.py --port 9911 --latency-ms 300 --fail-rate 0.1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.delivered = 0
+        self.failed = 0
+
+
+def make_handler(stats: Stats, latency: float, fail_rate: float, quiet: bool):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(latency)
+            if random.random() < fail_rate:
+                with stats.lock:
+                    stats.failed += 1
+                self.send_response(503)
+                self.end_headers()
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            with stats.lock:
+                stats.delivered += 1
+                delivered = stats.delivered
+            if not quiet:
+                print(f"[{delivered}] {payload.get('to')}: {payload.get('message')}")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"id": delivered, "status": "queued"}).encode())
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake SMS gateway for OTP load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9911)
+    parser.add_argument("--latency-ms", type=float, default=200, help="Simulated provider round trip")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--quiet", action="store_true", help="Only print periodic totals")
+    args = parser.parse_args()
+
+    stats = Stats()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(stats, args.latency_ms / 1000, args.fail_rate, args.quiet))
+    print(f"Fake SMS gateway on http://{args.host}:{args.port}/sms")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        while True:
+            time.sleep(5)
+            print(f"delivered={stats.delivered} failed={stats.failed}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
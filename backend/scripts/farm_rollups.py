@@ -0,0 +1,52 @@
+"""
+Maintain the per-farm financial rollups (farm_financials, farm_category_totals,
+farm_monthly_totals).
+
+Usage:
+    python scripts/farm_rollups.py rebuild            # backfill every farm
+    python scripts/farm_rollups.py rebuild --farm-id <uuid> [--farm-id <uuid> ...]
+    python scripts/farm_rollups.py check              # exit code 1 on any mismatch
+
+The Alembic migration backfills the rollups when it creates the tables; run
+`check` whenever the ledgers may have been written without going through the
+API, and `rebuild` to repair them.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from uuid import UUID
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, async_engine
+from app.services.rollup_service import rebuild_rollups, check_rollups
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify farm financial rollups")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--farm-id", action="append", type=UUID, dest="farm_ids")
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            if args.command == "rebuild":
+                count = await rebuild_rollups(db, args.farm_ids)
+                print(f"✅ Rebuilt rollups for {count} farm(s)")
+                return 0
+
+            mismatches = await check_rollups(db, args.farm_ids)
+            for m in mismatches:
+                print(f"❌ farm {m['farm_id']} {m['field']}: expected {m['expected']}, stored {m['actual']}")
+            if mismatches:
+                print(f"{len(mismatches)} mismatch(es); run `python scripts/farm_rollups.py rebuild` to repair")
+                return 1
+            print("✅ Rollups match the ledgers")
+            return 0
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
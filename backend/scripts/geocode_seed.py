@@ -0,0 +1,57 @@
+"""
+Build the offline geocode seed file (GEOCODE_SEED_PATH).
+
+Cities listed in the seed are answered from memory without touching the
+database or Open-Meteo. `resolve` geocodes a list of names (one per line)
+through the normal cache, `export` writes every cached hit to the seed CSV.
+
+Usage:
+    python scripts/geocode_seed.py resolve districts.txt
+    python scripts/geocode_seed.py export [--out geocode_seed.csv]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.services.geocode_cache import export_seed, lookup_city
+from app.utils.http_client import http_clients
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Resolve city names into the geocode cache or export it as a seed file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    resolve = sub.add_parser("resolve")
+    resolve.add_argument("names_file", help="Text file with one city name per line")
+    export = sub.add_parser("export")
+    export.add_argument("--out", default=settings.GEOCODE_SEED_PATH)
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            if args.command == "resolve":
+                with open(args.names_file, encoding="utf-8") as f:
+                    names = [line.strip() for line in f if line.strip()]
+                missing = 0
+                for name in names:
+                    coords = await lookup_city(db, name)
+                    if coords is None:
+                        missing += 1
+                        print(f"❌ {name}: not found")
+                print(f"✅ Resolved {len(names) - missing}/{len(names)} names")
+                return 0
+
+            count = await export_seed(db, args.out)
+            print(f"✅ Wrote {count} cities to {args.out}")
+            return 0
+    finally:
+        await http_clients.close()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
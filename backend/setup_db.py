@@ -14,7 +14,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.database import engine, Base
-from app.models import User, Farm, Expense, Yield
+from app.models import User, Farm, Expense, Yield, FarmFinancials, FarmCategoryTotal, FarmMonthlyTotal, ReportJob, GeocodeEntry
 
 def init_db():
     """Create all database tables"""
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import uuid
+
+# Point the app at throwaway storage before anything imports app.config
+_tmp = tempfile.mkdtemp(prefix="agrismart-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["REPORT_CACHE_DIR"] = os.path.join(_tmp, "report_cache")
+os.environ["OTP_STORE_BACKEND"] = "memory"
+os.environ["OTP_SENDER"] = "console"
+os.environ["RATE_LIMIT_BACKEND"] = "memory"
+os.environ["GEOCODE_SEED_PATH"] = os.path.join(_tmp, "geocode_seed.csv")
+os.environ["CLIMATOLOGY_PATH"] = os.path.join(_tmp, "climatology.npy")
+# The app's report workers only run when notified, so queue tests can drive claims themselves
+os.environ["REPORT_JOB_POLL_SECONDS"] = "3600"
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.database import AsyncSessionLocal, Base, engine
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def farm(db):
+    """A fresh user with one farm, so tests never see each other's ledger rows"""
+    from app.models import Farm, User
+
+    user = User(name="Test", phone=f"+91{uuid.uuid4().int % 10**10:010d}", is_active=True)
+    db.add(user)
+    await db.flush()
+    farm = Farm(user_id=user.id, name="Test farm", farm_type="wheat", total_area=5, area_unit="acre")
+    db.add(farm)
+    await db.commit()
+    return farm
+
+
+@pytest.fixture
+def auth_headers():
+    """Bearer headers for a fresh active user, for tests that go through the HTTP API"""
+    from app.database import SessionLocal
+    from app.models import User
+    from app.utils.jwt_handler import create_access_token
+
+    with SessionLocal() as session:
+        user = User(name="Test", phone=f"+91{uuid.uuid4().int % 10**10:010d}", is_active=True)
+        session.add(user)
+        session.commit()
+        token = create_access_token({"sub": str(user.id), "phone": user.phone})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    # One app lifetime for the whole run: background workers bind to the
+    # TestClient's event loop, so restarting the app per test is both slow and racy.
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
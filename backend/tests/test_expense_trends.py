@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+
+from app.models import Expense
+from app.utils.profit_calculator import get_expense_trends
+from app.utils.time_buckets import bucket_label, count_buckets, iter_buckets, season_start
+
+
+@pytest.mark.parametrize("day, start, label", [
+    (date(2026, 1, 15), date(2025, 11, 1), "Rabi 2025-26"),
+    (date(2025, 11, 1), date(2025, 11, 1), "Rabi 2025-26"),
+    (date(2026, 4, 30), date(2026, 4, 1), "Zaid 2026"),
+    (date(2026, 6, 1), date(2026, 6, 1), "Kharif 2026"),
+    (date(2026, 10, 31), date(2026, 6, 1), "Kharif 2026"),
+    (date(1999, 12, 31), date(1999, 11, 1), "Rabi 1999-00"),
+])
+def test_season_start_and_label(day, start, label):
+    assert season_start(day) == start
+    assert bucket_label("season", start) == label
+
+
+@pytest.mark.parametrize("bucket, first, last", [
+    ("day", date(2024, 2, 27), date(2024, 3, 2)),
+    ("week", date(2026, 1, 1), date(2026, 3, 1)),
+    ("month", date(2025, 11, 30), date(2026, 2, 1)),
+    ("season", date(2025, 3, 1), date(2026, 12, 1)),
+])
+def test_count_buckets_matches_iteration(bucket, first, last):
+    assert count_buckets(bucket, first, last) == len(list(iter_buckets(bucket, first, last)))
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month", "season"])
+def test_iter_buckets_stops_at_date_max(bucket):
+    starts = list(iter_buckets(bucket, date(9999, 1, 1), date.max))
+    assert starts[-1] <= date.max
+    assert len(starts) == count_buckets(bucket, date(9999, 1, 1), date.max)
+
+
+@pytest.mark.anyio
+async def test_fill_adds_empty_buckets_between_data(db, farm):
+    db.add_all([
+        Expense(farm_id=farm.id, crop_name="wheat", date=date(2026, 1, 10), category="seeds", amount=100),
+        Expense(farm_id=farm.id, crop_name="wheat", date=date(2026, 3, 5), category="labor", amount=50),
+    ])
+    await db.commit()
+
+    sparse = await get_expense_trends(db, farm.id, bucket="month")
+    assert [p["label"] for p in sparse] == ["2026-01", "2026-03"]
+
+    filled = await get_expense_trends(
+        db, farm.id, date(2025, 12, 1), date(2026, 4, 30), bucket="month", fill=True, cumulative=True,
+    )
+    assert [(p["label"], p["total"], p["cumulative"]) for p in filled] == [
+        ("2025-12", 0.0, 0.0),
+        ("2026-01", 100.0, 100.0),
+        ("2026-02", 0.0, 100.0),
+        ("2026-03", 50.0, 150.0),
+        ("2026-04", 0.0, 150.0),
+    ]
+
+    seasons = await get_expense_trends(db, farm.id, bucket="season", fill=True)
+    assert [(p["label"], p["total"]) for p in seasons] == [("Rabi 2025-26", 150.0)]
+
+
+@pytest.mark.anyio
+async def test_bad_ranges_are_rejected(db, farm):
+    with pytest.raises(ValueError):
+        await get_expense_trends(db, farm.id, date(2026, 2, 1), date(2026, 1, 1))
+    with pytest.raises(ValueError):
+        await get_expense_trends(db, farm.id, date(1, 1, 1), date(9999, 1, 1), bucket="day", fill=True)
+    points = await get_expense_trends(db, farm.id, date(9990, 1, 1), date.max, bucket="month", fill=True)
+    assert points[-1]["label"] == "9999-12"
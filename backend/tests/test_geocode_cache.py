@@ -0,0 +1,65 @@
+import pytest
+
+from app.services import geocode_cache as geocode
+from app.services.geocode_cache import GeocodeCache, lookup_city, normalize_city_name
+
+
+@pytest.mark.parametrize("name, key, query", [
+    ("Pune", "pune", "Pune"),
+    ("  pune   District ", "pune", "pune District"),
+    ("Bhōpāl", "bhopal", "Bhōpāl"),
+    ("ＰＵＮＥ", "pune", "PUNE"),
+    ("St. Thomas Mount", "st thomas mount", "St. Thomas Mount"),
+    ("Bangalore", "bengaluru", "Bengaluru"),
+    ("Poona", "pune", "Pune"),
+    ("Puna", "pune", "Pune"),
+    ("Simmla", "shimla", "Shimla"),
+])
+def test_latin_names_fold_to_one_key(name, key, query):
+    assert normalize_city_name(name) == (key, query)
+
+
+@pytest.mark.parametrize("name", ["पुणे", "नाशिक", "நாசிக்", "ಮೈಸೂರು"])
+def test_non_latin_names_keep_their_letters(name):
+    key, query = normalize_city_name(name)
+    assert key == name
+    assert query == name
+
+
+@pytest.mark.parametrize("first, second", [("Kota", "Kotta"), ("Pali", "Palli"), ("पुणे", "नाशिक")])
+def test_distinct_places_get_distinct_keys(first, second):
+    assert normalize_city_name(first)[0] != normalize_city_name(second)[0]
+
+
+@pytest.fixture
+def geocoder(monkeypatch):
+    calls = []
+
+    async def fake_geocode(query):
+        calls.append(query)
+        return {"पुणे": (18.52, 73.86), "Kotta": (11.0, 76.0)}.get(query)
+
+    monkeypatch.setattr(geocode, "geocode_city", fake_geocode)
+    monkeypatch.setattr(geocode, "geocode_cache", GeocodeCache(max_entries=100, ttl=60, negative_ttl=60, seed_path=None))
+    return calls
+
+
+@pytest.mark.anyio
+async def test_non_latin_name_is_geocoded_once_then_cached(db, geocoder):
+    assert await lookup_city(db, "पुणे") == (18.52, 73.86)
+    assert await lookup_city(db, " पुणे ") == (18.52, 73.86)
+    assert geocoder == ["पुणे"]
+
+
+@pytest.mark.anyio
+async def test_misses_are_cached_per_name(db, geocoder):
+    assert await lookup_city(db, "Kota") is None
+    assert await lookup_city(db, "Kotta") == (11.0, 76.0)
+    assert await lookup_city(db, "Kota") is None
+    assert geocoder == ["Kota", "Kotta"]
+
+
+@pytest.mark.anyio
+async def test_unkeyable_name_still_asks_the_geocoder(db, geocoder):
+    assert await lookup_city(db, "?!") is None
+    assert geocoder == ["?!"]
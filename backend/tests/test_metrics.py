@@ -0,0 +1,65 @@
+import time
+
+import httpx
+
+
+def test_principal_cache_counters_are_exposed(client, auth_headers):
+    before = client.get("/metrics").json()["principal_cache"]
+    assert set(before) >= {"entries", "hits", "misses", "evictions", "hit_rate"}
+
+    for _ in range(2):
+        assert client.get("/farms", headers=auth_headers).status_code == 200
+    after = client.get("/metrics").json()["principal_cache"]
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_response_cache_counters_are_exposed(client, auth_headers):
+    first = client.get("/farms", headers=auth_headers)
+    before = client.get("/metrics").json()["response_cache"]
+    assert set(before) >= {"entries", "bytes", "hits", "misses", "not_modified", "hit_rate"}
+
+    response = client.get("/farms", headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304
+    after = client.get("/metrics").json()["response_cache"]
+    assert after["not_modified"] == before["not_modified"] + 1
+
+
+def test_otp_delivery_counters_are_exposed(client):
+    before = client.get("/metrics").json()["otp_delivery"]
+    assert set(before) >= {"sender", "queue_depth", "sent", "failed", "retried"}
+
+    assert client.post("/auth/request-otp", json={"phone": "+919800000101"}).status_code == 200
+    deadline = time.monotonic() + 5
+    while True:
+        after = client.get("/metrics").json()["otp_delivery"]
+        if after["sent"] > before["sent"] or time.monotonic() > deadline:
+            break
+        time.sleep(0.02)
+    assert after["sent"] == before["sent"] + 1
+    assert after["sender"] == "ConsoleSender"
+    assert after["queue_depth"] == 0
+
+
+def test_http_client_counters_are_exposed(client, monkeypatch):
+    from app.config import settings
+    from app.utils.http_client import http_clients
+
+    monkeypatch.setattr(settings, "HTTP_CLIENT_RETRY_BACKOFF_SECONDS", 0)
+    statuses = iter([200, 503, 503, 503])
+
+    async def call(path):
+        # Registry clients are bound to the app's event loop, so install and use the stub there
+        http_clients.start()
+        http_clients._clients.setdefault(
+            "stub", httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(next(statuses))))
+        )
+        return (await http_clients.request("stub", "GET", f"http://upstream.test/{path}")).status_code
+
+    assert client.portal.call(call, "ok") == 200
+    assert client.portal.call(call, "busy") == 503
+
+    metrics = client.get("/metrics").json()["http_clients"]
+    assert set(metrics["pool"]) == {"max_connections", "max_keepalive_connections", "keepalive_expiry"}
+    assert metrics["upstreams"]["stub"] == {"requests": 2, "errors": 1, "retries": settings.HTTP_CLIENT_MAX_RETRIES}
+    client.portal.call(http_clients._clients.pop("stub").aclose)
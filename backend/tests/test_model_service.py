@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+
+from app.ml import model_service
+from app.ml.prediction_cache import prediction_cache
+
+
+class FakeEncoder:
+    def __init__(self, classes):
+        self.classes_ = np.array(classes, dtype=object)
+
+    def transform(self, values):
+        return np.array([list(self.classes_).index(v) for v in values])
+
+    def inverse_transform(self, labels):
+        return self.classes_[np.asarray(labels, dtype=int)]
+
+
+class FakeModel:
+    """Scores each crop class by one input column so the winner is predictable"""
+
+    classes_ = np.array([0, 1, 2])
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_proba(self, X):
+        self.calls.append(len(X))
+        logits = X[:, 1:4]  # n, p, k
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class IdentityScaler:
+    def transform(self, X):
+        return X
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    artifacts = (fake, IdentityScaler(), FakeEncoder(["rice", "wheat", "maize"]), FakeEncoder(["kharif", "rabi"]))
+    monkeypatch.setattr(model_service, "get_artifacts", lambda: artifacts)
+    prediction_cache.clear()
+    yield fake
+    prediction_cache.clear()
+
+
+def test_batch_results_keep_input_order(model):
+    rows = [
+        {"crop_type": "kharif", "n": 9, "p": 0, "k": 0},
+        {"crop_type": "rabi", "n": 0, "p": 9, "k": 0},
+        {"crop_type": "unknown", "n": 0, "p": 0, "k": 9},
+    ]
+    results = model_service.run_crop_prediction_batch(rows)
+    assert [r["recommended_crop"] for r in results] == ["rice", "wheat", "maize"]
+    assert model.calls == [3]
+
+
+def test_single_prediction_matches_batch(model):
+    row = {"crop_type": "rabi", "n": 1, "p": 5, "k": 2}
+    assert model_service.run_crop_prediction(row) == model_service.run_crop_prediction_batch([row])[0]
+
+
+def test_top_k_uses_model_probabilities(model):
+    result = model_service.run_crop_prediction({"n": 3, "p": 2, "k": 1, "top_k": 2})
+    probs = [c["probability"] for c in result["top_crops"]]
+    assert [c["crop"] for c in result["top_crops"]] == ["rice", "wheat"]
+    assert probs == sorted(probs, reverse=True)
+    assert result["confidence"] == probs[0]
+
+
+def test_empty_batch():
+    assert model_service.run_crop_prediction_batch([]) == []
+
+
+def test_fallback_without_model(monkeypatch):
+    def missing():
+        raise FileNotFoundError("no artifacts")
+
+    monkeypatch.setattr(model_service, "get_artifacts", missing)
+    prediction_cache.clear()
+    results = model_service.run_crop_prediction_batch([{"crop_type": "rice", "n": 10}, {"crop_type": "wheat"}])
+    assert [r["recommended_crop"] for r in results] == ["Rice", "Wheat"]
+    assert all(r["confidence"] == 0.0 and r["top_crops"] == [] for r in results)
+    assert prediction_cache.stats()["entries"] == 0
+
+
+def test_repeated_and_near_identical_rows_hit_the_cache(model):
+    model_service.run_crop_prediction({"crop_type": "rabi", "n": 9, "p": 1, "k": 1})
+    again = model_service.run_crop_prediction({"crop_type": "rabi", "n": 9.001, "p": 1, "k": 1})
+    assert again["recommended_crop"] == "rice"
+    assert model.calls == [1]
+
+
+def test_inputs_that_encode_alike_share_a_cache_entry(model):
+    first = model_service.run_crop_prediction({"crop_type": "rabi", "n": 4, "p": 1, "k": 1})
+    hits = prediction_cache.stats()["hits"]
+    second = model_service.run_crop_prediction({"crop_type": "  rabi ", "n": 4, "p": 1, "k": 1})
+    assert second == first
+    assert prediction_cache.stats()["hits"] == hits + 1
+    assert model.calls == [1]
+
+    # Unseen crop types all take the encoder's fallback slot
+    model_service.run_crop_prediction({"crop_type": "zaid", "n": 1, "p": 4, "k": 1})
+    model_service.run_crop_prediction({"crop_type": "millet", "n": 1, "p": 4, "k": 1})
+    assert model.calls == [1, 1]
+
+
+class ReversedModel(FakeModel):
+    """Same classes, but scores them by k, p, n instead"""
+
+    def predict_proba(self, X):
+        return super().predict_proba(X[:, [0, 3, 2, 1]])
+
+
+@pytest.fixture
+def reloadable(monkeypatch):
+    """Route reload_artifacts() through in-memory artifacts instead of .pkl files"""
+    for name in ("_artifacts", "_artifact_stamp", "_loaded_at", "_load_error"):
+        monkeypatch.setattr(model_service, name, getattr(model_service, name))
+    encoders = (FakeEncoder(["rice", "wheat", "maize"]), FakeEncoder(["kharif", "rabi"]))
+    versions = iter([(FakeModel(), IdentityScaler(), *encoders), (ReversedModel(), IdentityScaler(), *encoders)])
+    stamps = iter(range(100))
+    monkeypatch.setattr(model_service, "_resolve_artifact_paths", lambda: [])
+    monkeypatch.setattr(model_service, "_stamp", lambda paths: (("model.pkl", next(stamps), 0),))
+    monkeypatch.setattr(model_service, "_load_artifacts", lambda paths: next(versions))
+    prediction_cache.clear()
+    yield
+    prediction_cache.clear()
+
+
+def test_reload_invalidates_cached_predictions(reloadable):
+    row = {"crop_type": "kharif", "n": 9, "p": 0, "k": 0}
+    model_service.reload_artifacts(force=True)
+    assert model_service.run_crop_prediction(row)["recommended_crop"] == "rice"
+    assert prediction_cache.stats()["entries"] == 1
+
+    assert model_service.reload_artifacts(force=True)["reloaded"] is True
+    assert prediction_cache.stats()["entries"] == 0
+    assert model_service.run_crop_prediction(row)["recommended_crop"] == "maize"
+
+
+def test_result_scored_before_a_reload_is_not_cached():
+    cache = type(prediction_cache)(ttl_seconds=60, max_entries=10)
+    generation = cache.generation
+    cache.clear()  # a reload lands while the batch was being scored
+    cache.put(("key",), {"recommended_crop": "rice"}, generation)
+    assert cache.get(("key",)) is None
@@ -0,0 +1,60 @@
+import pytest
+
+from app.routes import auth
+from app.utils.otp_store import MemoryOTPStore, OTPStore, SQLiteOTPStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path) -> OTPStore:
+    if request.param == "memory":
+        return MemoryOTPStore()
+    return SQLiteOTPStore(str(tmp_path / "otp.db"))
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        OTPStore()
+
+
+def test_code_is_accepted_once(store):
+    store.put("+911", "123456", 60)
+    assert store.verify("+911", "123456", 3)
+    assert not store.verify("+911", "123456", 3)
+    assert len(store) == 0
+
+
+def test_wrong_guesses_exhaust_the_code(store):
+    store.put("+912", "123456", 60)
+    assert not store.verify("+912", "000000", 2)
+    assert not store.verify("+912", "111111", 2)
+    assert not store.verify("+912", "123456", 2)
+
+
+def test_new_code_replaces_old_one(store):
+    store.put("+913", "111111", 60)
+    store.put("+913", "222222", 60)
+    assert not store.verify("+913", "111111", 5)
+    assert store.verify("+913", "222222", 5)
+
+
+def test_expired_codes_are_rejected_and_swept(store):
+    store.put("+914", "123456", -1)
+    store.put("+915", "123456", -1)
+    store.put("+916", "123456", 60)
+    assert not store.verify("+914", "123456", 3)
+    store.sweep()
+    assert len(store) == 1
+    store.delete("+916")
+    assert len(store) == 0
+
+
+def test_register_and_verify_through_the_api(client, monkeypatch):
+    monkeypatch.setattr(auth, "generate_otp", lambda: "424242")
+    phone = "+919800000001"
+    r = client.post("/auth/register", json={"name": "OTP", "phone": phone})
+    assert r.status_code == 200, r.text
+
+    assert client.post("/auth/verify-otp", json={"phone": phone, "otp": "000000"}).status_code == 400
+    r = client.post("/auth/verify-otp", json={"phone": phone, "otp": "424242"})
+    assert r.status_code == 200, r.text
+    assert r.json()["access_token"]
@@ -0,0 +1,38 @@
+import re
+
+from app.services.pdf_renderer import render_report
+
+
+def report_data(ledger_rows: int):
+    return {
+        "farm": {"name": "Test farm", "type": "wheat", "size": "5 acre"},
+        "generated_at": "2026-01-01 00:00 UTC",
+        "totals": {"total_expenses": 100.0, "total_income": 50.0, "net_profit": -50.0, "profit_status": "loss", "profit_percentage": -50.0},
+        "categories": [{"category": "seeds", "amount": 100.0}],
+        "months": [{"month": "2026-01", "expenses": 100.0, "income": 50.0}],
+        "ledger": [
+            {"date": "2026-01-01", "category": "seeds", "amount": float(i), "note": f"row {i}"}
+            for i in range(ledger_rows)
+        ],
+        "ledger_truncated": False,
+    }
+
+
+def test_multi_page_report_is_well_framed():
+    pdf = render_report("expenses", report_data(300))
+    assert pdf.startswith(b"%PDF-1.4\n")
+    assert pdf.count(b"/Type /Page ") > 1
+
+    # Every stream is closed on its own line and followed by endobj
+    assert pdf.count(b"endstream") == pdf.count(b"/Type /Page ")
+    assert len(re.findall(rb"endstream\r?\n(?:\r?\n)*endobj", pdf)) == pdf.count(b"endstream")
+    assert b"endstreamendobj" not in pdf
+
+    # Every xref entry points at the matching "N 0 obj" header
+    startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF", pdf).group(1))
+    assert pdf[startxref:].startswith(b"xref\n")
+    count = int(re.match(rb"xref\n0 (\d+)\n", pdf[startxref:]).group(1))
+    entries = re.findall(rb"(\d{10}) 00000 n \n", pdf[startxref:])
+    assert len(entries) == count - 1
+    for number, offset in enumerate(entries, start=1):
+        assert pdf[int(offset):].startswith(b"%d 0 obj\n" % number)
@@ -0,0 +1,16 @@
+from app.config import settings
+
+
+def test_model_reload_is_disabled_without_ops_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "OPS_API_TOKEN", None)
+    assert client.post("/prediction/model/reload?force=true").status_code == 403
+
+
+def test_model_reload_requires_matching_ops_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "OPS_API_TOKEN", "s3cret")
+    assert client.post("/prediction/model/reload?force=true").status_code == 401
+    r = client.post("/prediction/model/reload?force=true", headers={"X-Ops-Token": "wrong"})
+    assert r.status_code == 401
+    # Authorized, but no artifacts exist in the test environment
+    r = client.post("/prediction/model/reload?force=true", headers={"X-Ops-Token": "s3cret"})
+    assert r.status_code == 500
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from app.utils.rate_limit import MemoryRateLimitStore, RateLimitStore, SQLiteRateLimitStore, parse_rule
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path) -> RateLimitStore:
+    if request.param == "memory":
+        return MemoryRateLimitStore(max_keys=100)
+    return SQLiteRateLimitStore(str(tmp_path / "rate.db"))
+
+
+def test_parse_rule():
+    assert parse_rule("phone:3/600") == ("phone", 3, 600.0)
+    assert parse_rule(" ip:20/60") == ("ip", 20, 60.0)
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        RateLimitStore()
+
+
+def test_limit_within_window(store):
+    checks = [("k", 2, 60)]
+    assert store.hit(checks) == 0
+    assert store.hit(checks) == 0
+    retry_after = store.hit(checks)
+    assert 59 < retry_after <= 60
+
+
+def test_window_slides(store):
+    checks = [("slide", 1, 0.05)]
+    assert store.hit(checks) == 0
+    assert store.hit(checks) > 0
+    time.sleep(0.06)
+    assert store.hit(checks) == 0
+
+
+def test_rejected_request_consumes_no_other_rule(store):
+    phone, ip = ("phone:+911", 3, 60), ("ip:1.2.3.4", 1, 60)
+    assert store.hit([phone, ip]) == 0
+    # The IP is exhausted; these must not spend the phone's remaining two slots
+    for _ in range(5):
+        assert store.hit([phone, ip]) > 0
+    assert store.hit([phone]) == 0
+    assert store.hit([phone]) == 0
+    assert store.hit([phone]) > 0
+
+
+def test_memory_store_evicts_least_recent_keys():
+    store = MemoryRateLimitStore(max_keys=2)
+    store.hit([("a", 1, 60)])
+    store.hit([("b", 1, 60)])
+    store.hit([("c", 1, 60)])
+    assert store.hit([("a", 1, 60)]) == 0  # forgotten, so allowed again
+    assert store.hit([("c", 1, 60)]) > 0
+
+
+def test_route_answers_429_with_retry_after(client):
+    phone = "+919800000002"
+    statuses = [client.post("/auth/request-otp", json={"phone": phone}).status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+    r = client.post("/auth/request-otp", json={"phone": phone})
+    assert int(r.headers["Retry-After"]) > 0
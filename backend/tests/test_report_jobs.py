@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete
+
+from app.models import ReportJob
+from app.services import report_jobs
+from app.services.report_jobs import ReportJobQueue
+
+pytestmark = pytest.mark.anyio
+
+
+def make_queue(**overrides) -> ReportJobQueue:
+    params = dict(workers=1, max_attempts=3, retry_seconds=10, lease_seconds=300, poll_seconds=3600)
+    params.update(overrides)
+    return ReportJobQueue(**params)
+
+
+@pytest.fixture
+async def job(db, farm):
+    # _claim takes any available job, so start from an empty queue
+    await db.execute(delete(ReportJob))
+    job = ReportJob(user_id=farm.user_id, farm_id=farm.id, kind="summary", data_version="v1", available_at=datetime.utcnow())
+    db.add(job)
+    await db.commit()
+    yield job
+    await db.execute(delete(ReportJob))
+    await db.commit()
+
+
+async def reload(db, job) -> ReportJob:
+    return await db.get(ReportJob, job.id, populate_existing=True)
+
+
+async def test_claim_leases_job_to_one_worker(db, job):
+    queue = make_queue()
+    assert await queue._claim() == job.id
+    assert await queue._claim() is None
+
+    job = await reload(db, job)
+    assert (job.status, job.attempts) == ("running", 1)
+    assert job.available_at > datetime.utcnow() + timedelta(seconds=290)
+
+
+async def test_expired_lease_is_reclaimed_until_attempts_run_out(db, job):
+    queue = make_queue(max_attempts=2, lease_seconds=-1)  # every lease is already expired
+    assert await queue._claim() == job.id
+    assert await queue._claim() == job.id
+    assert await queue._claim() is None
+
+    job = await reload(db, job)
+    assert (job.status, job.attempts) == ("failed", 2)
+    assert "Lease expired" in job.error
+
+
+async def test_failed_render_backs_off_then_fails(db, job, monkeypatch):
+    async def broken(db, farm, kind):
+        raise RuntimeError("renderer crashed")
+
+    monkeypatch.setattr(report_jobs, "build_report", broken)
+    queue = make_queue(max_attempts=2)
+
+    await queue._process(await queue._claim())
+    job = await reload(db, job)
+    assert (job.status, job.attempts) == ("pending", 1)
+    assert job.error == "RuntimeError: renderer crashed"
+    assert job.available_at > datetime.utcnow() + timedelta(seconds=9)
+
+    job.available_at = datetime.utcnow()
+    await db.commit()
+    await queue._process(await queue._claim())
+    job = await reload(db, job)
+    assert (job.status, job.attempts) == ("failed", 2)
+
+
+async def test_successful_render_marks_job_done(db, job, monkeypatch, tmp_path):
+    async def render(db, farm, kind):
+        return tmp_path / f"{kind}.pdf"
+
+    monkeypatch.setattr(report_jobs, "build_report", render)
+    queue = make_queue()
+    await queue._process(await queue._claim())
+
+    job = await reload(db, job)
+    assert (job.status, job.error) == ("done", None)
+    assert Path(job.file_path) == tmp_path / "summary.pdf"
@@ -0,0 +1,75 @@
+from app.utils.response_cache import ResponseCache
+
+
+def create_farm(client, headers) -> str:
+    r = client.post("/farms", json={"farmName": "ETag farm", "farmSize": 2}, headers=headers)
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def add_expense(client, headers, farm_id, amount):
+    r = client.post(
+        f"/farms/{farm_id}/expenses",
+        json={"amount": amount, "date": "2026-05-01", "category": "seeds"},
+        headers=headers,
+    )
+    assert r.status_code == 201
+
+
+def test_unchanged_data_is_answered_with_304(client, auth_headers):
+    farm_id = create_farm(client, auth_headers)
+    add_expense(client, auth_headers, farm_id, 120)
+    url = f"/farms/{farm_id}/expenses/by-category"
+
+    first = client.get(url, headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+    assert first.json() == [{"category": "seeds", "amount": 120.0}]
+
+    for conditional in ({"If-None-Match": etag}, {"If-None-Match": f'"other", W/{etag}'}):
+        r = client.get(url, headers={**auth_headers, **conditional})
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["ETag"] == etag
+
+    other = client.get(f"/farms/{farm_id}/expenses/trend?bucket=day", headers=auth_headers)
+    assert other.headers["ETag"] != etag
+
+
+def test_write_changes_etag_and_body(client, auth_headers):
+    farm_id = create_farm(client, auth_headers)
+    add_expense(client, auth_headers, farm_id, 10)
+    url = f"/farms/{farm_id}/expenses/by-category"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+
+    add_expense(client, auth_headers, farm_id, 5)
+    r = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert r.json() == [{"category": "seeds", "amount": 15.0}]
+
+
+def test_write_in_the_same_second_is_not_masked_by_if_modified_since(client, auth_headers):
+    farm_id = create_farm(client, auth_headers)
+    add_expense(client, auth_headers, farm_id, 10)
+    url = f"/farms/{farm_id}/expenses/by-category"
+    last_modified = client.get(url, headers=auth_headers).headers["Last-Modified"]
+
+    add_expense(client, auth_headers, farm_id, 5)  # well within the same second
+    r = client.get(url, headers={**auth_headers, "If-Modified-Since": last_modified})
+    assert r.status_code == 200
+    assert r.json() == [{"category": "seeds", "amount": 15.0}]
+
+
+def test_cache_evicts_least_recently_used_within_byte_budget():
+    cache = ResponseCache(max_entries=10, max_bytes=10)
+    cache.put(("a",), b"12345")
+    cache.put(("b",), b"12345")
+    assert cache.get(("a",)) == b"12345"  # a is now most recent
+    cache.put(("c",), b"123")
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None and cache.get(("c",)) is not None
+    cache.put(("huge",), b"x" * 11)
+    assert cache.get(("huge",)) is None
+    assert cache.stats()["bytes"] == 8
@@ -0,0 +1,76 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import Expense, Yield
+from app.services.rollup_service import (
+    category_totals,
+    check_rollups,
+    get_farm_financials,
+    monthly_totals,
+    rebuild_rollups,
+    record_expense,
+    record_yield,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_expense(db, farm, category, day, amount):
+    expense = Expense(farm_id=farm.id, crop_name="wheat", date=day, category=category, amount=amount)
+    db.add(expense)
+    await record_expense(db, farm.id, category, day, amount)
+    await db.commit()
+
+
+async def add_yield(db, farm, day, income):
+    record = Yield(farm_id=farm.id, crop_name="wheat", date=day, quantity_kg=10, price_per_kg=1, total_income=income)
+    db.add(record)
+    await record_yield(db, farm.id, day, income)
+    await db.commit()
+
+
+async def test_writes_keep_rollups_in_step_with_ledgers(db, farm):
+    await add_expense(db, farm, "seeds", date(2026, 1, 5), 100.25)
+    await add_expense(db, farm, "seeds", date(2026, 1, 20), 50)
+    await add_expense(db, farm, "labor", date(2026, 2, 1), 300)
+    await add_yield(db, farm, date(2026, 2, 14), 1200.5)
+
+    assert await check_rollups(db, [farm.id]) == []
+    assert await category_totals(db, farm.id) == [("labor", Decimal("300")), ("seeds", Decimal("150.25"))]
+    assert await monthly_totals(db, farm.id) == [
+        (date(2026, 1, 1), Decimal("150.25"), Decimal("0")),
+        (date(2026, 2, 1), Decimal("300"), Decimal("1200.5")),
+    ]
+
+
+async def test_first_write_seeds_rollup_from_existing_ledger(db, farm):
+    # History written before the rollup tables existed
+    db.add_all([
+        Expense(farm_id=farm.id, crop_name="wheat", date=date(2025, 11, 3), category="fuel", amount=40),
+        Expense(farm_id=farm.id, crop_name="wheat", date=date(2025, 12, 9), category="seeds", amount=60),
+        Yield(farm_id=farm.id, crop_name="wheat", date=date(2025, 12, 20), quantity_kg=1, price_per_kg=1, total_income=500),
+    ])
+    await db.commit()
+    assert await get_farm_financials(db, farm.id) is None
+
+    await add_expense(db, farm, "seeds", date(2026, 1, 2), 10)
+
+    financials = await get_farm_financials(db, farm.id)
+    assert (financials.expense_count, financials.yield_count) == (3, 1)
+    assert Decimal(str(financials.total_expenses)) == Decimal("110")
+    assert await check_rollups(db, [farm.id]) == []
+
+
+async def test_check_reports_drift_and_rebuild_repairs_it(db, farm):
+    await add_expense(db, farm, "seeds", date(2026, 3, 1), 20)
+    # A ledger row written behind the API's back
+    db.add(Expense(farm_id=farm.id, crop_name="wheat", date=date(2026, 3, 2), category="seeds", amount=5))
+    await db.commit()
+
+    fields = {m["field"] for m in await check_rollups(db, [farm.id])}
+    assert {"total_expenses", "expense_count", "category:seeds", "month:2026-03:expenses"} <= fields
+
+    assert await rebuild_rollups(db, [farm.id]) == 1
+    assert await check_rollups(db, [farm.id]) == []
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime
+
+import httpx
+import numpy as np
+import pytest
+
+from app.services import weather_service
+from app.services.climatology import Climatology, write_climatology
+from app.services.weather_service import WeatherCache
+from app.utils.http_client import http_clients
+
+pytestmark = pytest.mark.anyio
+
+HOURLY = {"temperature_2m": [20, 22, None], "relativehumidity_2m": [50, 70, 60], "precipitation": [0.5, None, 1.0]}
+
+
+@pytest.fixture
+def normals(tmp_path, monkeypatch):
+    path = str(tmp_path / "climatology.npy")
+    grid = np.full((1, 1, 12, 3), np.nan)
+    grid[0, 0, datetime.utcnow().month - 1] = (25.0, 65.0, 0.0)
+    write_climatology(path, grid, lat0=18.0, lon0=73.0, step=1.0)
+    monkeypatch.setattr(weather_service, "climatology", Climatology(path))
+
+
+@pytest.fixture
+async def upstream(monkeypatch):
+    """Serve Open-Meteo requests from the body set on the returned dict"""
+    reply = {"content": b""}
+
+    def handler(request):
+        return httpx.Response(200, content=reply["content"], headers={"content-type": "application/json"})
+
+    http_clients.start()
+    monkeypatch.setitem(http_clients._clients, "open-meteo", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return reply
+
+
+def make_cache() -> WeatherCache:
+    return WeatherCache(grid_degrees=0.1, ttl_seconds=60, max_cells=10, deadline_seconds=2.0, source="forecast")
+
+
+async def test_forecast_is_aggregated_and_cached(normals, upstream):
+    upstream["content"] = json.dumps({"hourly": HOURLY}).encode()
+    cache = make_cache()
+    assert await cache.features(18.5, 73.8) == {"temperature": 21.0, "humidity": 60.0, "rainfall": 1.5}
+    await cache.features(18.5, 73.8)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+@pytest.mark.parametrize("body", [b"<html>bad gateway</html>", b'{"hourly": {"temperature_2m": [2', b'{"latitude": 18.5}', b"[]"])
+async def test_malformed_forecast_falls_back_to_climatology(normals, upstream, body):
+    upstream["content"] = body
+    cache = make_cache()
+    assert await cache.features(18.5, 73.8) == {"temperature": 25.0, "humidity": 65.0, "rainfall": 0.0}
+    assert cache.upstream_errors == 1
+    assert cache.stats()["cells"] == 0